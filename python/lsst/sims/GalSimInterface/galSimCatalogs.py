@@ -314,14 +314,13 @@ class GalSimBase(InstanceCatalog, CameraCoords):
             if not hasattr(self, 'bandpassDict'):
                 raise RuntimeError('ran initializeGalSimCatalog but do not have bandpassDict')
 
-        output = []
-        for (name, ra, dec, xp, yp, hlr, minor, major, pa, ss, sn) in \
-            zip(objectNames, raICRS, decICRS, xPupil, yPupil, halfLight, \
-                minorAxis, majorAxis, positionAngle, sedList, sindex):
+        output = [None]*len(objectNames)
+        drawIndices = []
+        fluxList = []
+        for ix, (name, ss) in enumerate(zip(objectNames, sedList)):
 
             if ss is None or name in self.objectHasBeenDrawn:
                 #do not draw objects that have no SED or have already been drawn
-                output.append(None)
                 if name in self.objectHasBeenDrawn:
                     #15 December 2014
                     #This should probably be an error.  However, something is wrong with
@@ -330,24 +329,31 @@ class GalSimBase(InstanceCatalog, CameraCoords):
                     #the problem.  Until then, this will just warn you that the same object
                     #appears twice in your catalog and will refrain from drawing it the second
                     #time.
-                    print 'Trying to draw %s more than once ' % str(name)
+                    print('Trying to draw %s more than once ' % str(name))
 
             else:
 
                 self.objectHasBeenDrawn.append(name)
 
-                flux_dict = {}
-                for bb in self.bandpassNames:
-                    adu = ss.calcADU(self.bandpassDict[bb], self.photParams)
-                    flux_dict[bb] = adu*self.photParams.gain
+                fluxList.append([ss.calcADU(self.bandpassDict[bb], self.photParams)*self.photParams.gain
+                                 for bb in self.bandpassNames])
 
-                gsObj = GalSimCelestialObject(self.galsim_type, ss, ra, dec, xp, yp, \
-                                              hlr, minor, major, pa, sn, flux_dict)
+                drawIndices.append(ix)
 
-                #actually draw the object
-                detectorsString = self.galSimInterpreter.drawObject(gsObj)
+        drawIndices = numpy.array(drawIndices, dtype=int)
 
-                output.append(detectorsString)
+        gsObjList = GalSimCelestialObject.fromArrays(self.galsim_type,
+                                                     [sedList[ix] for ix in drawIndices],
+                                                     raICRS[drawIndices], decICRS[drawIndices],
+                                                     xPupil[drawIndices], yPupil[drawIndices],
+                                                     halfLight[drawIndices], minorAxis[drawIndices],
+                                                     majorAxis[drawIndices], positionAngle[drawIndices],
+                                                     sindex[drawIndices], self.bandpassNames,
+                                                     numpy.array(fluxList))
+
+        for ix, gsObj in zip(drawIndices, gsObjList):
+            #actually draw the object
+            output[ix] = self.galSimInterpreter.drawObject(gsObj)
 
         return numpy.array(output)
 
@@ -473,7 +479,7 @@ class GalSimBase(InstanceCatalog, CameraCoords):
             self.galSimInterpreter.setPSF(PSF=self.PSF)
 
 
-    def write_images(self, nameRoot=None):
+    def write_images(self, nameRoot=None, nThreads=1):
         """
         Writes the FITS images associated with this InstanceCatalog.
 
@@ -482,17 +488,34 @@ class GalSimBase(InstanceCatalog, CameraCoords):
         @param [in] nameRoot is an optional string prepended to the names
         of the FITS images.  The FITS images will be named
 
-        @param [out] namesWritten is a list of the names of the FITS files generated
-
         nameRoot_DetectorName_FilterName.fits
 
         (e.g. myImages_R_0_0_S_1_1_y.fits for an LSST-like camera with
         nameRoot = 'myImages')
+
+        @param [in] nThreads is the number of threads over which to spread the
+        writing of the FITS images (default 1)
+
+        @param [out] namesWritten is a list of the names of the FITS files generated
         """
-        namesWritten = self.galSimInterpreter.writeImages(nameRoot=nameRoot)
+        namesWritten = self.galSimInterpreter.writeImages(nameRoot=nameRoot, nThreads=nThreads)
 
         return namesWritten
 
+    def write_multi_extension_image(self, fileName):
+        """
+        Writes all of the FITS images associated with this InstanceCatalog to
+        a single multi-extension FITS file, one image per HDU.
+
+        Cannot be called before write_catalog is called.
+
+        @param [in] fileName is the name of the FITS file to be written
+
+        @param [out] nameList is a list of the names the images would have had
+        if written by write_images (without nameRoot); nameList[i] is in HDU i
+        """
+        return self.galSimInterpreter.writeMultiExtensionImage(fileName)
+
 class GalSimGalaxies(GalSimBase, AstrometryGalaxies, EBVmixin):
     """
     This is a GalSimCatalog class for galaxy components (i.e. objects that are shaped
@@ -1,8 +1,11 @@
-import numpy
-from lsst.sims.utils import arcsecFromRadians
+import math
 
 __all__ = ["GalSimCelestialObject"]
 
+# multiply by this to convert radians into arcseconds (this is what
+# lsst.sims.utils.arcsecFromRadians does, without the function call)
+_arcsecPerRadian = 3600.0*180.0/math.pi
+
 class GalSimCelestialObject(object):
     """
     This is a class meant to carry around all of the data required by
@@ -10,8 +13,22 @@ class GalSimCelestialObject(object):
     is that all of the drawing functions in the GalSimInterpreter will
     just take a GalSimCelestialObject as an argument, rather than taking
     a bunch of different arguments, one for each datum.
+
+    The data are stored in __slots__ and exposed as plain attributes.
+    They are read-only; attempting to set any of them after instantiation
+    raises a RuntimeError.
+
+    The arcsecond versions of the pupil coordinates and half light radius
+    are only calculated the first time they are asked for (unless they
+    were provided up front by fromArrays()).
     """
 
+    __slots__ = ('galSimType', 'sed', 'raRadians', 'decRadians',
+                 'xPupilRadians', '_xPupilArcsec', 'yPupilRadians', '_yPupilArcsec',
+                 'halfLightRadiusRadians', '_halfLightRadiusArcsec',
+                 'minorAxisRadians', 'majorAxisRadians', 'positionAngleRadians',
+                 'sindex', '_fluxIndex', '_fluxes')
+
     def __init__(self, galSimType, sed, ra, dec, xPupil, yPupil,
                  halfLightRadius, minorAxis, majorAxis, positionAngle,
                  sindex, fluxDict):
@@ -46,170 +63,149 @@ class GalSimCelestialObject(object):
         u band and 41000 electrons in the g band.
         """
 
-        self._galSimType = galSimType
-        self._sed = sed
-        self._raRadians = ra
-        self._decRadians = dec
-        self._xPupilRadians = xPupil
-        self._xPupilArcsec = arcsecFromRadians(xPupil)
-        self._yPupilRadians = yPupil
-        self._yPupilArcsec = arcsecFromRadians(yPupil)
-        self._halfLightRadiusRadians = halfLightRadius
-        self._halfLightRadiusArcsec = arcsecFromRadians(halfLightRadius)
-        self._minorAxisRadians = minorAxis
-        self._majorAxisRadians = majorAxis
-        self._positionAngleRadians = positionAngle
-        self._sindex = sindex
-        self._fluxDict = fluxDict
+        fluxIndex = dict((bb, ix) for ix, bb in enumerate(fluxDict))
+        fluxes = tuple(fluxDict[bb] for bb in fluxDict)
 
+        self._setData(galSimType, sed, ra, dec,
+                      xPupil, None, yPupil, None, halfLightRadius, None,
+                      minorAxis, majorAxis, positionAngle, sindex,
+                      fluxIndex, fluxes)
 
-    @property
-    def galSimType(self):
-        return self._galSimType
 
-    @galSimType.setter
-    def galSimType(self, value):
-        raise RuntimeError("You should not be setting galSimType on the fly; " \
-                           + "just instantiate a new GalSimCelestialObject")
+    @classmethod
+    def fromArrays(cls, galSimType, sedList, ra, dec, xPupil, yPupil,
+                   halfLightRadius, minorAxis, majorAxis, positionAngle,
+                   sindex, bandpassNames, fluxArray):
+        """
+        Create a list of GalSimCelestialObjects from columns of data.
 
+        This is equivalent to calling the constructor once per object, except
+        that the conversions from radians to arcseconds are done on whole
+        numpy arrays at once, rather than one object at a time.
 
-    @property
-    def sed(self):
-        return self._sed
+        @param [in] galSimType is a string, either 'pointSource' or 'sersic',
+        denoting the shape of all of the objects
 
-    @sed.setter
-    def sed(self, value):
-        raise RuntimeError("You should not be setting sed on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
+        @param [in] sedList is a list of the objects' SEDs
 
+        @param [in] ra, dec, xPupil, yPupil, halfLightRadius, minorAxis, majorAxis,
+        positionAngle, and sindex are numpy arrays of the corresponding
+        constructor arguments (in radians where applicable)
 
-    @property
-    def raRadians(self):
-        return self._raRadians
+        @param [in] bandpassNames is a list of the names of the bandpasses
+        for which fluxes are provided
 
-    @raRadians.setter
-    def raRadians(self, value):
-        raise RuntimeError("You should not be setting raRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
+        @param [in] fluxArray is a 2-D numpy array of electron counts; fluxArray[i][j]
+        is the flux of the ith object in the bandpass bandpassNames[j]
 
+        @param [out] a list of GalSimCelestialObjects
+        """
+        # Unpack each column into Python scalars in one pass, rather than
+        # creating a numpy scalar every time an element is accessed.
+        xPupilArcsec = (xPupil*_arcsecPerRadian).tolist()
+        yPupilArcsec = (yPupil*_arcsecPerRadian).tolist()
+        halfLightRadiusArcsec = (halfLightRadius*_arcsecPerRadian).tolist()
+        columns = zip(sedList, ra.tolist(), dec.tolist(),
+                      xPupil.tolist(), xPupilArcsec,
+                      yPupil.tolist(), yPupilArcsec,
+                      halfLightRadius.tolist(), halfLightRadiusArcsec,
+                      minorAxis.tolist(), majorAxis.tolist(),
+                      positionAngle.tolist(), sindex.tolist())
+        fluxRows = [tuple(row) for row in fluxArray.tolist()]
+
+        # one band-to-column map is shared by all of the objects
+        fluxIndex = dict((bb, ix) for ix, bb in enumerate(bandpassNames))
+
+        objList = []
+        for row, fluxes in zip(columns, fluxRows):
+            obj = cls.__new__(cls)
+            obj._setData(galSimType, *row, fluxIndex=fluxIndex, fluxes=fluxes)
+            objList.append(obj)
+
+        return objList
+
+
+    def _setData(self, galSimType, sed, ra, dec,
+                 xPupil, xPupilArcsec, yPupil, yPupilArcsec,
+                 halfLightRadius, halfLightRadiusArcsec,
+                 minorAxis, majorAxis, positionAngle, sindex, fluxIndex, fluxes):
+        """
+        Fill in the slots of this object (bypassing __setattr__, which
+        forbids setting attributes).  Any of the arcsecond values may be None,
+        in which case they will be calculated when they are first asked for.
 
-    @property
-    def decRadians(self):
-        return self._decRadians
+        fluxIndex is a dict mapping bandpass names to indices in the tuple
+        fluxes.
+        """
+        _set = object.__setattr__
+        _set(self, 'galSimType', galSimType)
+        _set(self, 'sed', sed)
+        _set(self, 'raRadians', ra)
+        _set(self, 'decRadians', dec)
+        _set(self, 'xPupilRadians', xPupil)
+        _set(self, '_xPupilArcsec', xPupilArcsec)
+        _set(self, 'yPupilRadians', yPupil)
+        _set(self, '_yPupilArcsec', yPupilArcsec)
+        _set(self, 'halfLightRadiusRadians', halfLightRadius)
+        _set(self, '_halfLightRadiusArcsec', halfLightRadiusArcsec)
+        _set(self, 'minorAxisRadians', minorAxis)
+        _set(self, 'majorAxisRadians', majorAxis)
+        _set(self, 'positionAngleRadians', positionAngle)
+        _set(self, 'sindex', sindex)
+        _set(self, '_fluxIndex', fluxIndex)
+        _set(self, '_fluxes', fluxes)
+
+
+    def __setattr__(self, name, value):
+        raise RuntimeError("You should not be setting %s on the fly; " % name \
+                           + "just instantiate a new GalSimCelestialObject")
 
-    @decRadians.setter
-    def decRadians(self, value):
-        raise RuntimeError("You should not be setting decRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
 
+    def __getstate__(self):
+        """
+        Return the contents of the slots (in the order _setData takes them),
+        so that the object can be copied and pickled
+        """
+        return tuple(object.__getattribute__(self, name) for name in self.__slots__)
 
-    @property
-    def xPupilRadians(self):
-        return self._xPupilRadians
 
-    @xPupilRadians.setter
-    def xPupilRadians(self, value):
-        raise RuntimeError("You should not be setting xPupilRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
+    def __setstate__(self, state):
+        """
+        Restore the slots from the output of __getstate__.  The default
+        implementation would go through __setattr__, which forbids this.
+        """
+        self._setData(*state)
 
 
     @property
     def xPupilArcsec(self):
+        if self._xPupilArcsec is None:
+            object.__setattr__(self, '_xPupilArcsec', self.xPupilRadians*_arcsecPerRadian)
         return self._xPupilArcsec
 
-    @xPupilArcsec.setter
-    def xPupilArcsec(self, value):
-        raise RuntimeError("You should not be setting xPupilArcsec on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
-
-    @property
-    def yPupilRadians(self):
-        return self._yPupilRadians
-
-    @yPupilRadians.setter
-    def yPupilRadians(self, value):
-        raise RuntimeError("You should not be setting yPupilRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
 
     @property
     def yPupilArcsec(self):
+        if self._yPupilArcsec is None:
+            object.__setattr__(self, '_yPupilArcsec', self.yPupilRadians*_arcsecPerRadian)
         return self._yPupilArcsec
 
-    @yPupilArcsec.setter
-    def yPupilArcsec(self, value):
-        raise RuntimeError("You should not be setting yPupilArcsec on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
-
-    @property
-    def halfLightRadiusRadians(self):
-        return self._halfLightRadiusRadians
-
-    @halfLightRadiusRadians.setter
-    def halfLightRadiusRadians(self, value):
-        raise RuntimeError("You should not be setting halfLightRadiusRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
 
     @property
     def halfLightRadiusArcsec(self):
+        if self._halfLightRadiusArcsec is None:
+            object.__setattr__(self, '_halfLightRadiusArcsec',
+                               self.halfLightRadiusRadians*_arcsecPerRadian)
         return self._halfLightRadiusArcsec
 
-    @halfLightRadiusArcsec.setter
-    def halfLightRadiusArcsec(self, value):
-        raise RuntimeError("You should not be setting halfLightRadiusArcsec on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
-
-    @property
-    def minorAxisRadians(self):
-        return self._minorAxisRadians
-
-    @minorAxisRadians.setter
-    def minorAxisRadians(self, value):
-        raise RuntimeError("You should not be setting minorAxisRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
-
-    @property
-    def majorAxisRadians(self):
-        return self._majorAxisRadians
-
-    @majorAxisRadians.setter
-    def majorAxisRadians(self, value):
-        raise RuntimeError("You should not be setting majorAxisRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
-
-    @property
-    def positionAngleRadians(self):
-        return self._positionAngleRadians
-
-    @positionAngleRadians.setter
-    def positionAngleRadians(self, value):
-        raise RuntimeError("You should not be setting positionAngleRadians on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
-
-    @property
-    def sindex(self):
-        return self._sindex
-
-    @sindex.setter
-    def sindex(self, value):
-        raise RuntimeError("You should not be setting sindex on the fly; " \
-        + "just instantiate a new GalSimCelestialObject")
-
 
     def flux(self, band):
         """
         @param [in] band is the name of a bandpass
 
-        @param [out] the ADU in that bandpass, as stored in self._fluxDict
+        @param [out] the electron count in that bandpass, as stored in self._fluxes
         """
-        if band not in self._fluxDict:
+        try:
+            return self._fluxes[self._fluxIndex[band]]
+        except KeyError:
             raise RuntimeError("Asked GalSimCelestialObject for flux in %s; that band does not exist" % band)
-
-        return self._fluxDict[band]
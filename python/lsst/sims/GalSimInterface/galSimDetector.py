@@ -1,16 +1,103 @@
 import re
+import copy
+import weakref
+import threading
+from collections import OrderedDict
 import galsim
 import numpy
 import lsst.afw.geom as afwGeom
 from lsst.afw.cameraGeom import PUPIL, PIXELS, FOCAL_PLANE
-from lsst.sims.utils import arcsecFromRadians, radiansFromArcsec
+from lsst.sims.utils import radiansFromArcsec
 from lsst.sims.coordUtils import _raDecFromPixelCoords, \
                                  _pixelCoordsFromRaDec, \
                                  pixelCoordsFromPupilCoords
 from lsst.sims.GalSimInterface.wcsUtils import tanSipWcsFromDetector
+from lsst.sims.GalSimInterface.galSimCelestialObject import _arcsecPerRadian
 
 __all__ = ["GalSimDetector"]
 
+# characters in detector names that cannot appear in FITS file names
+_fileNameRegex = re.compile('[,: ]')
+
+# pattern of the (formatted) names of LSST camera detectors
+_lsstChipRegex = re.compile('R_[0-9]_[0-9]_S_[0-9]_[0-9]')
+
+# A cache of TAN-SIP WCS fits, so that detectors that are instantiated more than
+# once for the same camera and pointing (e.g. by successive catalogs, even ones
+# with their own ObservationMetaData) do not re-fit their WCS.
+#
+# The keys are the values that determine a fit, so the cache holds no reference
+# to the ObservationMetaData.  Cameras are identified by id(); each entry only
+# holds a weak reference to its camera, which is checked on lookup so that a
+# camera which happens to get the id of a garbage collected one is not given
+# that camera's fits.  The cache therefore does not keep cameras alive; it does
+# keep up to _tanSipWcsCacheSize fits alive (one small afw WCS each), evicting
+# the least recently used fit first.  The lock guards the dict, not the fit, so
+# two threads may occasionally fit the same WCS.
+_tanSipWcsCache = OrderedDict()
+_tanSipWcsCacheLock = threading.Lock()
+
+# The LSST camera has 189 science sensors plus a few dozen wavefront and guide
+# sensors, so this holds the fits for the whole focal plane at four pointings
+# (e.g. a full-focal-plane run over several dithers) with room to spare.
+_tanSipWcsCacheSize = 1024
+
+
+def _tanSipWcsKey(afwDetector, afwCamera, obs_metadata, epoch):
+    """
+    Return the key under which the TAN-SIP WCS fit to afwDetector for this
+    camera, pointing, and epoch is stored in _tanSipWcsCache
+    """
+
+    if obs_metadata.mjd is not None:
+        mjd = obs_metadata.mjd.TAI
+    else:
+        mjd = None
+
+    site = obs_metadata.site
+    if site is not None:
+        siteKey = (site.longitude, site.latitude, site.height, site.temperature,
+                   site.pressure, site.humidity, site.lapseRate)
+    else:
+        siteKey = None
+
+    return (afwDetector.getName(), id(afwCamera),
+            obs_metadata._pointingRA, obs_metadata._pointingDec, obs_metadata._rotSkyPos,
+            mjd, siteKey, epoch)
+
+
+def _getTanSipWcs(afwDetector, afwCamera, obs_metadata, epoch):
+    """
+    Return tanSipWcsFromDetector(afwDetector, afwCamera, obs_metadata, epoch),
+    only doing the fit if it has not already been done for this detector,
+    camera, and pointing.
+    """
+
+    key = _tanSipWcsKey(afwDetector, afwCamera, obs_metadata, epoch)
+
+    with _tanSipWcsCacheLock:
+        entry = _tanSipWcsCache.pop(key, None)
+        if entry is not None and entry[0]() is afwCamera:
+            # put the entry back at the end, as the most recently used
+            _tanSipWcsCache[key] = entry
+            return entry[1]
+
+    tanSipWcs = tanSipWcsFromDetector(afwDetector, afwCamera, obs_metadata, epoch)
+
+    try:
+        cameraRef = weakref.ref(afwCamera)
+    except TypeError:
+        # there is no way to tell whether this camera's id gets recycled,
+        # so do not cache its fits
+        return tanSipWcs
+
+    with _tanSipWcsCacheLock:
+        _tanSipWcsCache[key] = (cameraRef, tanSipWcs)
+        while len(_tanSipWcsCache) > _tanSipWcsCacheSize:
+            _tanSipWcsCache.popitem(last=False)
+
+    return tanSipWcs
+
 
 class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
     """
@@ -24,7 +111,7 @@ class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
     http://fits.gsfc.nasa.gov/registry/sip/SIP_distortion_v1_0.pdf
     """
 
-    def __init__(self, afwDetector, afwCamera, obs_metadata, epoch, photParams=None, wcs=None):
+    def __init__(self, afwDetector, afwCamera, obs_metadata, epoch, photParams=None):
         """
         @param [in] afwDetector is an instantiation of afw.cameraGeom.Detector
 
@@ -38,15 +125,9 @@ class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
 
         @param [in] photParams is an instantiation of PhotometricParameters
         (it will contain information about gain, exposure time, etc.)
-
-        @param [in] wcs is a kwarg that is used by the method _newOrigin().
-        The wcs kwarg in this constructor method should not be used by users.
         """
 
-        if wcs is None:
-            self._tanSipWcs = tanSipWcsFromDetector(afwDetector, afwCamera, obs_metadata, epoch)
-        else:
-            self._tanSipWcs = wcs
+        self._tanSipWcs = _getTanSipWcs(afwDetector, afwCamera, obs_metadata, epoch)
 
         self.afwDetector = afwDetector
         self.afwCamera = afwCamera
@@ -79,6 +160,20 @@ class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
         self.origin = galsim.PositionD(x=self.crpix1, y=self.crpix2)
 
 
+    def _radecArray(self, x, y):
+        """
+        Convert numpy arrays of pixel coordinates (with crpix1 and crpix2
+        subtracted from them) into numpy arrays of ra, dec in radians.
+        """
+
+        chipNameList = [self.afwDetector.getName()] * len(x)
+
+        return _raDecFromPixelCoords(x + self.afw_crpix1, y + self.afw_crpix2, chipNameList,
+                                     camera=self.afwCamera,
+                                     obs_metadata=self.obs_metadata,
+                                     epoch=self.epoch)
+
+
     def _radec(self, x, y):
         """
         This is a method required by the GalSim WCS API
@@ -88,20 +183,27 @@ class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
         Return ra, dec in radians.
         """
 
-        chipNameList = [self.afwDetector.getName()]
+        if isinstance(x, numpy.ndarray):
+            return self._radecArray(x, y)
 
-        if type(x) is numpy.ndarray:
-            chipNameList = chipNameList * len(x)
+        ra, dec = self._radecArray(numpy.array([x]), numpy.array([y]))
+        return (ra[0], dec[0])
 
-        ra, dec = _raDecFromPixelCoords(x + self.afw_crpix1, y + self.afw_crpix2, chipNameList,
-                                        camera=self.afwCamera,
-                                        obs_metadata=self.obs_metadata,
-                                        epoch=self.epoch)
 
-        if type(x) is numpy.ndarray:
-            return (ra, dec)
-        else:
-            return (ra[0], dec[0])
+    def _xyArray(self, ra, dec):
+        """
+        Convert numpy arrays of ra, dec in radians into numpy arrays of
+        x, y in pixel space with crpix subtracted.
+        """
+
+        chipNameList = [self.afwDetector.getName()] * len(ra)
+
+        xx, yy = _pixelCoordsFromRaDec(ra, dec, chipNames=chipNameList,
+                                       obs_metadata=self.obs_metadata,
+                                       epoch=self.epoch,
+                                       camera=self.afwCamera)
+
+        return (xx-self.afw_crpix1, yy-self.afw_crpix2)
 
 
     def _xy(self, ra, dec):
@@ -111,20 +213,11 @@ class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
         Convert ra, dec in radians into x, y in pixel space with crpix subtracted.
         """
 
-        chipNameList = [self.afwDetector.getName()]
+        if isinstance(ra, numpy.ndarray):
+            return self._xyArray(ra, dec)
 
-        if type(ra) is numpy.ndarray:
-            chipNameLIst = chipNameList * len(ra)
-
-        xx, yy = calculatePixelCoordinates(ra=ra, dec=dec, chipNames=chipNameList,
-                                            obs_metadata=self.obs_metadata,
-                                            epoch=self.epoch,
-                                            camera = self.afwCamera)
-
-        if type(ra) is numpy.ndarray:
-            return (xx-self.crpix1, yy-self.crpix2)
-        else:
-            return (xx[0]-self.crpix1, yy-self.crpix2)
+        xx, yy = self._xyArray(numpy.array([ra]), numpy.array([dec]))
+        return (xx[0], yy[0])
 
 
     def _newOrigin(self, origin):
@@ -139,8 +232,12 @@ class GalSim_afw_TanSipWCS(galsim.wcs.CelestialWCS):
         @param [out] _newWcs is a WCS identical to self, but with the origin
         in pixel space moved to the specified origin
         """
-        _newWcs = GalSim_afw_TanSipWCS(self.afwDetector, self.afwCamera, self.obs_metadata, self.epoch,
-                                       photParams=self.photParams, wcs=self._tanSipWcs)
+        # All of the afw objects are shared read-only with self; only the FITS
+        # header (which records CRPIX) needs to be copied.  This avoids calling
+        # getFitsMetadata() and re-processing the header every time GalSim moves
+        # the origin.
+        _newWcs = copy.copy(self)
+        _newWcs.fitsHeader = self.fitsHeader.deepCopy()
         _newWcs.crpix1 = origin.x
         _newWcs.crpix2 = origin.y
         _newWcs.fitsHeader.set('CRPIX1', origin.x)
@@ -193,54 +290,51 @@ class GalSimDetector(object):
         self._yMaxPix = bbox.getMaxY()
 
         self._bbox = afwGeom.Box2D(bbox)
+        self._bboxMinX = self._bbox.getMinX()
+        self._bboxMaxX = self._bbox.getMaxX()
+        self._bboxMinY = self._bbox.getMinY()
+        self._bboxMaxY = self._bbox.getMaxY()
 
         pupilSystem = afwDetector.makeCameraSys(PUPIL)
         pixelSystem = afwDetector.makeCameraSys(PIXELS)
 
         centerPoint = afwDetector.getCenter(FOCAL_PLANE)
         centerPupil = afwCamera.transform(centerPoint, pupilSystem).getPoint()
-        self._xCenterArcsec = arcsecFromRadians(centerPupil.getX())
-        self._yCenterArcsec = arcsecFromRadians(centerPupil.getY())
+        self._xCenterArcsec = centerPupil.getX()*_arcsecPerRadian
+        self._yCenterArcsec = centerPupil.getY()*_arcsecPerRadian
         centerPixel = afwCamera.transform(centerPoint, pixelSystem).getPoint()
         self._xCenterPix = centerPixel.getX()
         self._yCenterPix = centerPixel.getY()
 
-        self._xMinArcsec = None
-        self._yMinArcsec = None
-        self._xMaxArcsec = None
-        self._yMaxArcsec = None
         cornerPointList = afwDetector.getCorners(FOCAL_PLANE)
-        for cornerPoint in cornerPointList:
+        cornerPupil = numpy.empty((len(cornerPointList), 2))
+        for ix, cornerPoint in enumerate(cornerPointList):
             cameraPoint = afwDetector.makeCameraPoint(cornerPoint, FOCAL_PLANE)
             cameraPointPupil = afwCamera.transform(cameraPoint, pupilSystem).getPoint()
+            cornerPupil[ix][0] = cameraPointPupil.getX()
+            cornerPupil[ix][1] = cameraPointPupil.getY()
 
-            xx = arcsecFromRadians(cameraPointPupil.getX())
-            yy = arcsecFromRadians(cameraPointPupil.getY())
-            if self._xMinArcsec is None or xx<self._xMinArcsec:
-                self._xMinArcsec = xx
-            if self._xMaxArcsec is None or xx>self._xMaxArcsec:
-                self._xMaxArcsec = xx
-            if self._yMinArcsec is None or yy<self._yMinArcsec:
-                self._yMinArcsec = yy
-            if self._yMaxArcsec is None or yy>self._yMaxArcsec:
-                self._yMaxArcsec = yy
-
+        cornerArcsec = cornerPupil*_arcsecPerRadian
+        self._xMinArcsec, self._yMinArcsec = cornerArcsec.min(axis=0)
+        self._xMaxArcsec, self._yMaxArcsec = cornerArcsec.max(axis=0)
 
         self._photParams = photParams
         self._fileName = self._getFileName()
 
+        # LSST detectors need extra cards in their FITS headers for DM;
+        # work out whether this is one (and what DM calls it) once, here
+        self._isLsst = _lsstChipRegex.match(self._fileName) is not None
+        if self._isLsst:
+            self._lsstChipId = self._fileName.replace('_','').replace('S', '_S')
+        else:
+            self._lsstChipId = None
+
 
     def _getFileName(self):
         """
         Format the name of the detector to add to the name of the FITS file
         """
-        detectorName = self.name
-        detectorName = detectorName.replace(',','_')
-        detectorName = detectorName.replace(':','_')
-        detectorName = detectorName.replace(' ','_')
-
-        name = detectorName
-        return name
+        return _fileNameRegex.sub('_', self.name)
 
 
     def pixelCoordinatesFromRaDec(self, ra, dec):
@@ -256,14 +350,9 @@ class GalSimDetector(object):
         @param [out] yPix is a numpy array indicating the y pixel coordinate
         """
 
-        nameList = [self.name]
-        if type(ra) is numpy.ndarray:
-            nameList = nameList*len(ra)
-            raLocal=ra
-            decLocal=dec
-        else:
-            raLocal = numpy.array([ra])
-            decLocal = numpy.array([dec])
+        raLocal = numpy.atleast_1d(ra)
+        decLocal = numpy.atleast_1d(dec)
+        nameList = [self._name]*len(raLocal)
 
         xPix, yPix = _pixelCoordsFromRaDec(raLocal, decLocal, chipNames=nameList,
                                            obs_metadata=self._obs_metadata,
@@ -289,14 +378,9 @@ class GalSimDetector(object):
         @param [out] yPix is a numpy array indicating the y pixel coordinate
         """
 
-        nameList = [self._name]
-        if type(xPupil) is numpy.ndarray:
-            nameList = nameList*len(xPupil)
-            xp = xPupil
-            yp = yPupil
-        else:
-            xp = numpy.array([xPupil])
-            yp = numpy.array([yPupil])
+        xp = numpy.atleast_1d(xPupil)
+        yp = numpy.atleast_1d(yPupil)
+        nameList = [self._name]*len(xp)
 
         xPix, yPix = pixelCoordsFromPupilCoords(xp, yp, chipNames=nameList,
                                                 camera=self._afwCamera)
@@ -304,6 +388,32 @@ class GalSimDetector(object):
         return xPix, yPix
 
 
+    def _containsPixelCoordinates(self, xPix, yPix):
+        """
+        Do the given pixel coordinates fall on this detector?
+
+        This reproduces afwGeom.Box2D.contains() (which includes the minimum
+        edge of the box, but not the maximum edge) without having to construct
+        an afwGeom.Point2D for every point.
+
+        @param [in] xPix is a numpy array of x pixel coordinates
+
+        @param [in] yPix is a numpy array of y pixel coordinates
+
+        @param [out] answer is a numpy array of booleans indicating whether or not
+        the corresponding pixel coordinates fall inside this detector's bounding box
+        """
+        # accumulate the answer in place, re-using one scratch array for the
+        # individual comparisons, to avoid allocating a temporary array for
+        # every comparison and every '&'
+        answer = numpy.greater_equal(xPix, self._bboxMinX)
+        scratch = numpy.empty_like(answer)
+        answer &= numpy.less(xPix, self._bboxMaxX, out=scratch)
+        answer &= numpy.greater_equal(yPix, self._bboxMinY, out=scratch)
+        answer &= numpy.less(yPix, self._bboxMaxY, out=scratch)
+        return answer
+
+
     def containsRaDec(self, ra, dec):
         """
         Does a given RA, Dec fall on this detector?
@@ -312,14 +422,13 @@ class GalSimDetector(object):
 
         @param [in] dec is a numpy array or a float indicating Dec in radians
 
-        @param [out] answer is an array of booleans indicating whether or not
-        the corresponding RA, Dec pair falls on this detector
+        @param [out] answer is a numpy array of booleans indicating whether or not
+        the corresponding RA, Dec pair falls on this detector (suitable for use
+        as a mask on the input arrays)
         """
 
         xPix, yPix = self.pixelCoordinatesFromRaDec(ra, dec)
-        points = [afwGeom.Point2D(xx, yy) for xx, yy in zip(xPix, yPix)]
-        answer = [self._bbox.contains(pp) for pp in points]
-        return answer
+        return self._containsPixelCoordinates(xPix, yPix)
 
 
     def containsPupilCoordinates(self, xPupil, yPupil):
@@ -329,16 +438,25 @@ class GalSimDetector(object):
         @param [in] xPupil is a numpy array or a float indicating x pupil coordinates
         in radians
 
-        @param [in] yPupuil is a numpy array or a float indicating y pupil coordinates
+        @param [in] yPupil is a numpy array or a float indicating y pupil coordinates
         in radians
 
-        @param [out] answer is an array of booleans indicating whether or not
-        the corresponding RA, Dec pair falls on this detector
+        @param [out] answer is a numpy array of booleans indicating whether or not
+        the corresponding pupil coordinate pair falls on this detector (suitable
+        for use as a mask on the input arrays)
         """
         xPix, yPix = self.pixelCoordinatesFromPupilCoordinates(xPupil, yPupil)
-        points = [afwGeom.Point2D(xx, yy) for xx, yy in zip(xPix, yPix)]
-        answer = [self._bbox.contains(pp) for pp in points]
-        return answer
+        return self._containsPixelCoordinates(xPix, yPix)
+
+
+    def initializeWcs(self):
+        """
+        Construct this detector's WCS now, rather than waiting until it is
+        first asked for (constructing the WCS requires fitting a TAN-SIP
+        WCS to the detector, which is the most expensive part of setting
+        the detector up)
+        """
+        return self.wcs
 
 
     @property
@@ -560,11 +678,10 @@ class GalSimDetector(object):
                                              photParams=self.photParams)
 
 
-            if re.match('R_[0-9]_[0-9]_S_[0-9]_[0-9]', self.fileName) is not None:
+            if self._isLsst:
                 # This is an LSST camera; format the FITS header to feed through DM code
 
-                wcsName = self.fileName.replace('_','')
-                wcsName = wcsName.replace('S', '_S')
+                wcsName = self._lsstChipId
 
                 self._wcs.fitsHeader.set("CHIPID", wcsName)
 
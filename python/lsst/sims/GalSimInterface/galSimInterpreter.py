@@ -11,12 +11,24 @@ GalSimInterpreter expects.
 import os
 import numpy
 import galsim
+from multiprocessing.pool import ThreadPool
 from lsst.sims.utils import radiansFromArcsec
 from lsst.sims.coordUtils import pixelCoordsFromPupilCoords
 
 __all__ = ["GalSimInterpreter"]
 
 
+def _intervalsOverlap(aMin, aMax, bMin, bMax):
+    """
+    Return True if the closed intervals [aMin, aMax] and [bMin, bMax] overlap
+    (including the case where one interval lies entirely inside the other).
+
+    bMin and bMax may be numpy arrays, in which case a numpy array of booleans
+    is returned.
+    """
+    return (aMax >= bMin) & (aMin <= bMax)
+
+
 class GalSimInterpreter(object):
     """
     This is the class which actually takes the objects contained in the GalSim Instance Catalog and converts them
@@ -43,6 +55,7 @@ class GalSimInterpreter(object):
         """
 
         self.obs_metadata = obs_metadata
+        self._drawMethods = {'sersic': self.drawSersic, 'pointSource': self.drawPointSource}
         self.epoch = epoch
         self.PSF = None
         self.noiseWrapper = noiseWrapper
@@ -57,11 +70,48 @@ class GalSimInterpreter(object):
 
         self.detectors = detectors
 
+        #the pupil coordinate bounds (in arcseconds) of all of the detectors, so that
+        #findAllDetectors can compare an object to every detector at once
+        self._detectorXMin = numpy.array([dd.xMinArcsec for dd in detectors])
+        self._detectorXMax = numpy.array([dd.xMaxArcsec for dd in detectors])
+        self._detectorYMin = numpy.array([dd.yMinArcsec for dd in detectors])
+        self._detectorYMax = numpy.array([dd.yMaxArcsec for dd in detectors])
+
         self.detectorImages = {} #this dict will contain the FITS images (as GalSim images)
+
         self.bandpassDict = bandpassDict
-        self.blankImageCache = {} #this dict will cache blank images associated with specific detectors.
-                                  #It turns out that calling the image's constructor is more time-consuming than
-                                  #returning a deep copy
+        self._bandpassNames = list(bandpassDict) #the order in which drawObject visits the bandpasses
+
+        #the keys of self.detectorImages, indexed as [detector index][bandpass index], so that
+        #drawObject does not have to build file names for every object it draws
+        self._detectorIndex = dict((dd.name, ix) for ix, dd in enumerate(detectors))
+        self._detectorImageNames = [[self._getFileName(detector=dd, bandpassName=bp)
+                                     for bp in self._bandpassNames]
+                                    for dd in detectors]
+        self.blankImageCache = {} #this dict will cache the shape and WCS of the blank images
+                                  #associated with specific detectors.  It turns out that
+                                  #calling the image's constructor with dimensions is more
+                                  #time-consuming than wrapping a freshly zeroed array
+
+
+    def initializeWcs(self, nThreads=1):
+        """
+        Construct the WCS of every detector up front, rather than letting each
+        detector construct its WCS the first time an object is drawn on it.
+
+        @param [in] nThreads is the number of threads over which to spread the
+        construction of the WCSs (default 1, i.e. construct them serially)
+        """
+        if nThreads > 1:
+            pool = ThreadPool(nThreads)
+            try:
+                pool.map(lambda detector: detector.initializeWcs(), self.detectors)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for detector in self.detectors:
+                detector.initializeWcs()
 
 
     def setPSF(self, PSF=None):
@@ -85,8 +135,7 @@ class GalSimInterpreter(object):
         return detector.fileName+'_'+bandpassName+'.fits'
 
 
-    def _doesObjectImpingeOnDetector(self, xPupil=None, yPupil=None, detector=None,
-                                     imgScale=None, nonZeroPixels=None):
+    def _doesObjectImpingeOnDetector(self, xPupil=None, yPupil=None, detector=None):
         """
         Compare an astronomical object to a detector and determine whether or not that object will cast any
         light on that detector (in case the object is near the edge of a detector and will cast some
@@ -94,38 +143,28 @@ class GalSimInterpreter(object):
 
         This method is called by the method findAllDetectors.  findAllDetectors will generate a test image
         of an astronomical object.  It will find all of the pixels in that test image with flux above
-        a certain threshold and pass that list of pixels into this method along with data characterizing
-        the detector in question.  This method compares the pupil coordinates of those pixels with the pupil
-        coordinate domain of the detector. If some of those pixels fall inside the detector, then this method
-        returns True (signifying that the astronomical object does cast light on the detector).  If not, this
-        method returns False.
+        a certain threshold, convert them into pupil coordinates, and pass those pupil coordinates into
+        this method along with the detector in question.  This method compares the pupil coordinates of
+        those pixels with the pupil coordinate domain of the detector. If some of those pixels fall inside
+        the detector, then this method returns True (signifying that the astronomical object does cast
+        light on the detector).  If not, this method returns False.
 
-        @param [in] xPupil the x pupil coordinate of the image's origin in arcseconds
+        @param [in] xPupil is a numpy array of the x pupil coordinates (in radians) of the
+        active pixels in the test image
 
-        @param [in] yPupil the y pupil coordinate of the image's origin in arcseconds
+        @param [in] yPupil is a numpy array of the y pupil coordinates (in radians) of the
+        active pixels in the test image
 
         @param [in] detector an instantiation of GalSimDetector.  This is the detector against
         which we will compare the object.
-
-        @param [in] nonZeroPixels is a numpy array of non-zero pixels from the test image referenced
-        above.  nonZeroPixels[0] is their x coordinate (in pixel value).  nonZeroPixels[1] is
-        ther y coordinate.
-
-        @param [in] imgScale is the platescale of the test image in arcseconds per pixel
         """
 
-        if detector is None:
+        if detector is None or len(xPupil) == 0:
             return False
 
-        xPupilList = radiansFromArcsec(numpy.array([xPupil + ix*imgScale for ix in nonZeroPixels[0]]))
-        yPupilList = radiansFromArcsec(numpy.array([yPupil + iy*imgScale for iy in nonZeroPixels[1]]))
-
-        answer = detector.containsPupilCoordinates(xPupilList, yPupilList)
+        answer = detector.containsPupilCoordinates(xPupil, yPupil)
 
-        if True in answer:
-            return True
-        else:
-            return False
+        return bool(answer.any())
 
 
     def findAllDetectors(self, gsObject):
@@ -155,87 +194,87 @@ class GalSimInterpreter(object):
 
         outputString = ''
         outputList = []
-        centeredObj = None
         testScale = 0.1
 
         #create a GalSim Object centered on the chip.
         centeredObj = self.createCenteredObject(gsObject)
 
-        if centeredObj is None:
-            return
-
-        #4 March 2015
-        #create a test image of the object to compare against the pixel
-        #domains of each detector.  Use photon shooting rather than real space integration
-        #for reasons of speed.  A flux of 1000 photons ought to be enough to plot the true
-        #extent of the object, but this is just a guess.
-        centeredImage = centeredObj.drawImage(scale=testScale, method='phot', n_photons=1000, rng=self._rng)
-        xmax = testScale * (centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-        xmin = testScale * (-1*centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-        ymax = testScale * (centeredImage.getYMax()/2) + gsObject.yPupilArcsec
-        ymin = testScale *(-1*centeredImage.getYMin()/2) + gsObject.yPupilArcsec
+        #work out how large a test image of the object needs to be.  This is the
+        #same size GalSim would choose if it were left to size the image itself,
+        #so we can check it against the detectors before actually drawing anything.
+        imageSize = centeredObj.getGoodImageSize(testScale)
+        xmax = gsObject.xPupilArcsec + 0.5*testScale*imageSize
+        xmin = gsObject.xPupilArcsec - 0.5*testScale*imageSize
+        ymax = gsObject.yPupilArcsec + 0.5*testScale*imageSize
+        ymin = gsObject.yPupilArcsec - 0.5*testScale*imageSize
 
         #first assemble a list of detectors which have any hope
         #of overlapping the test image
-        viableDetectors = []
-        for dd in self.detectors:
-            xOverLaps = False
-            if xmax > dd.xMinArcsec and xmax < dd.xMaxArcsec:
-                xOverLaps = True
-            elif xmin > dd.xMinArcsec and xmin < dd.xMaxArcsec:
-                xOverLaps = True
-            elif xmin < dd.xMinArcsec and xmax > dd.xMaxArcsec:
-                xOverLaps = True
-
-            yOverLaps = False
-            if ymax > dd.yMinArcsec and ymax < dd.yMaxArcsec:
-                yOverLaps = True
-            elif ymin > dd.yMinArcsec and ymin < dd.yMaxArcsec:
-                yOverLaps = True
-            elif ymin < dd.yMinArcsec and ymax > dd.yMaxArcsec:
-                yOverLaps = True
-
-            if xOverLaps and yOverLaps and dd not in outputList:
-                viableDetectors.append(dd)
+        viableDetectors = numpy.flatnonzero(_intervalsOverlap(xmin, xmax, self._detectorXMin, self._detectorXMax) &
+                                            _intervalsOverlap(ymin, ymax, self._detectorYMin, self._detectorYMax))
 
 
         if len(viableDetectors)>0:
 
+            #4 March 2015
+            #create a test image of the object to compare against the pixel
+            #domains of each detector.  Use photon shooting rather than real space integration
+            #for reasons of speed.  A flux of 1000 photons ought to be enough to plot the true
+            #extent of the object, but this is just a guess.
+            #
+            #Note: objects that fail the cull above never draw this image, so they do
+            #not advance self._rng.  For a given seed, the random numbers used by the
+            #objects after them (and hence their test images) depend on how many
+            #objects were culled.
+            centeredImage = centeredObj.drawImage(nx=imageSize, ny=imageSize, scale=testScale,
+                                                  method='phot', n_photons=1000, rng=self._rng)
+
             #Find the pixels that have a flux greater than 0.001 times the flux of
             #the central pixel (remember that the object is centered on the test image)
             maxPixel = centeredImage(centeredImage.getXMax()/2, centeredImage.getYMax()/2)
-            activePixels = numpy.where(centeredImage.array>maxPixel*0.001)
-
-            #Find the bounds of those active pixels in pixel coordinates
-            xmin = testScale * (activePixels[0].min() - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-            xmax = testScale * (activePixels[0].max() - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
-            ymin = testScale * (activePixels[1].min() - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
-            ymax = testScale * (activePixels[1].max() - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
-
-            #find all of the detectors that overlap with the bounds of the active pixels.
-            for dd in viableDetectors:
-                xOverLaps = False
-                if xmax > dd.xMinArcsec and xmax < dd.xMaxArcsec:
-                    xOverLaps = True
-                elif xmin > dd.xMinArcsec and xmin < dd.xMaxArcsec:
-                    xOverLaps = True
-                elif xmin < dd.xMinArcsec and xmax > dd.xMaxArcsec:
-                    xOverLaps = True
-
-                yOverLaps = False
-                if ymax > dd.yMinArcsec and ymax < dd.yMaxArcsec:
-                    yOverLaps = True
-                elif ymin > dd.yMinArcsec and ymin < dd.yMaxArcsec:
-                    yOverLaps = True
-                elif ymin < dd.yMinArcsec and ymax > dd.yMaxArcsec:
-                    yOverLaps = True
-
-                #specifically test that these overlapping detectors do contain active pixels
-                if xOverLaps and yOverLaps:
-                    if self._doesObjectImpingeOnDetector(xPupil=gsObject.xPupilArcsec - centeredImage.getXMax()*testScale/2.0,
-                                                         yPupil=gsObject.yPupilArcsec - centeredImage.getYMax()*testScale/2.0,
-                                                         detector=dd, imgScale=centeredImage.scale,
-                                                         nonZeroPixels=activePixels):
+            activeMask = centeredImage.array>maxPixel*0.001
+
+            #Find the bounds of those active pixels in pixel coordinates.  Only the
+            #first and last active index along each axis are needed, so reduce the
+            #mask along each axis rather than listing every active pixel.
+            activeAlong0 = activeMask.any(axis=1)
+            activeAlong1 = activeMask.any(axis=0)
+
+            if activeAlong0.any():
+                min0 = activeAlong0.argmax()
+                max0 = len(activeAlong0) - 1 - activeAlong0[::-1].argmax()
+                min1 = activeAlong1.argmax()
+                max1 = len(activeAlong1) - 1 - activeAlong1[::-1].argmax()
+
+                xmin = testScale * (min0 - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
+                xmax = testScale * (max0 - centeredImage.getXMax()/2) + gsObject.xPupilArcsec
+                ymin = testScale * (min1 - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
+                ymax = testScale * (max1 - centeredImage.getYMax()/2) + gsObject.yPupilArcsec
+
+                #find all of the detectors that overlap with the bounds of the active pixels.
+                overlaps = _intervalsOverlap(xmin, xmax, self._detectorXMin[viableDetectors],
+                                             self._detectorXMax[viableDetectors]) & \
+                           _intervalsOverlap(ymin, ymax, self._detectorYMin[viableDetectors],
+                                             self._detectorYMax[viableDetectors])
+
+                viableDetectors = viableDetectors[overlaps]
+            else:
+                viableDetectors = viableDetectors[:0]
+
+            if len(viableDetectors)>0:
+                #Find the pupil coordinates (in radians) of the active pixels; these are the
+                #same for every detector, so only calculate them once
+                activePixels = numpy.nonzero(activeMask)
+                xPupilActive = radiansFromArcsec(gsObject.xPupilArcsec - centeredImage.getXMax()*testScale/2.0 +
+                                                 activePixels[0]*centeredImage.scale)
+                yPupilActive = radiansFromArcsec(gsObject.yPupilArcsec - centeredImage.getYMax()*testScale/2.0 +
+                                                 activePixels[1]*centeredImage.scale)
+
+                for ix in viableDetectors:
+                    dd = self.detectors[ix]
+
+                    #specifically test that these overlapping detectors do contain active pixels
+                    if self._doesObjectImpingeOnDetector(xPupil=xPupilActive, yPupil=yPupilActive, detector=dd):
 
                         if outputString != '':
                             outputString += '//'
@@ -256,20 +295,47 @@ class GalSimInterpreter(object):
         param [in] detector is an instantiation of GalSimDetector
         """
 
-        #in order to speed up the code (by a factor of ~2), this method
-        #only draws a new blank image the first time it is called on a
-        #given detector.  It then caches the blank images it has drawn and
-        #uses GalSim's copy() method to return copies of cached blank images
-        #whenever they are called for again.
+        #in order to speed up the code, this method only works out the
+        #shape and WCS of a detector's image the first time it is called
+        #on that detector.  It caches them and, whenever a blank image is
+        #called for, wraps a freshly zeroed numpy array in a GalSim Image.
+        #numpy.zeros gets its memory already zeroed from the allocator, so
+        #this is cheaper than copying a cached blank image.
 
-        if detector.name in self.blankImageCache:
-            return self.blankImageCache[detector.name].copy()
-        else:
-            image = galsim.Image(detector.xMaxPix-detector.xMinPix+1, detector.yMaxPix-detector.yMinPix+1,
-                                 wcs=detector.wcs)
+        try:
+            shape, wcs = self.blankImageCache[detector.name]
+        except KeyError:
+            shape = (detector.yMaxPix-detector.yMinPix+1, detector.xMaxPix-detector.xMinPix+1)
+            wcs = detector.wcs
+            self.blankImageCache[detector.name] = (shape, wcs)
 
-            self.blankImageCache[detector.name] = image
-            return image.copy()
+        return galsim.Image(numpy.zeros(shape, dtype=numpy.float32), wcs=wcs)
+
+    def _initializeDetectorImage(self, detector, bandpassName):
+        """
+        Create the image onto which objects will be drawn for a detector/bandpass
+        combination.  The image starts out blank, with sky background and noise
+        added to it if this GalSimInterpreter has a noiseWrapper.  This is only
+        done once per detector/bandpass combination; drawObject then just adds
+        objects to the image.
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] bandpassName is a string i.e. 'u' denoting the filter being drawn
+
+        @param [out] the GalSim image (which is also stored in self.detectorImages)
+        """
+        image = self.blankImage(detector=detector)
+        if self.noiseWrapper is not None:
+            #Add sky background and noise to the image
+            image = self.noiseWrapper.addNoiseAndBackground(image,
+                                                            bandpass=self.bandpassDict[bandpassName],
+                                                            m5=self.obs_metadata.m5[bandpassName],
+                                                            FWHMeff=self.obs_metadata.seeing[bandpassName],
+                                                            photParams=detector.photParams)
+
+        self.detectorImages[self._getFileName(detector=detector, bandpassName=bandpassName)] = image
+        return image
 
     def drawObject(self, gsObject):
         """
@@ -292,48 +358,39 @@ class GalSimInterpreter(object):
             #there is nothing to draw
             return outputString
 
+        imageNameRows = [self._detectorImageNames[self._detectorIndex[detector.name]]
+                         for detector in detectorList]
+
         #go through the list of detector/bandpass combinations and initialize
         #all of the FITS files we will need (if they have not already been initialized)
-        for detector in detectorList:
-            for bandpassName in self.bandpassDict:
-                name = self._getFileName(detector=detector, bandpassName=bandpassName)
+        for detector, nameRow in zip(detectorList, imageNameRows):
+            for bandpassName, name in zip(self._bandpassNames, nameRow):
                 if name not in self.detectorImages:
-                    self.detectorImages[name] = self.blankImage(detector=detector)
-                    if self.noiseWrapper is not None:
-                        #Add sky background and noise to the image
-                        self.detectorImages[name] = self.noiseWrapper.addNoiseAndBackground(self.detectorImages[name],
-                                                                              bandpass=self.bandpassDict[bandpassName],
-                                                                              m5=self.obs_metadata.m5[bandpassName],
-                                                                              FWHMeff=self.obs_metadata.seeing[bandpassName],
-                                                                              photParams=detector.photParams)
-
-        for bandpassName in self.bandpassDict:
-
-            #create a new object if one has not already been created or if the PSF is wavelength
-            #dependent (in which case, each filter is going to need its own initialized object)
-            if centeredObj is None:
-                return outputString
-
-            for detector in detectorList:
+                    self._initializeDetectorImage(detector, bandpassName)
 
-                name = self._getFileName(detector=detector, bandpassName=bandpassName)
+        #find the pixel coordinates of the object on every detector it illumines
+        #(these do not depend on the bandpass, so only calculate them once)
+        xPixList, yPixList = pixelCoordsFromPupilCoords(numpy.array([gsObject.xPupilRadians]*len(detectorList)),
+                                                        numpy.array([gsObject.yPupilRadians]*len(detectorList)),
+                                                        chipNames=[detector.name for detector in detectorList],
+                                                        camera=detectorList[0].afwCamera)
 
-                xPix, yPix = pixelCoordsFromPupilCoords(numpy.array([gsObject.xPupilRadians]),
-                                                        numpy.array([gsObject.yPupilRadians]),
-                                                        chipNames=[detector.name],
-                                                        camera=detector.afwCamera)
+        for iBandpass, bandpassName in enumerate(self._bandpassNames):
 
-                obj = centeredObj.copy()
+            #convolve the object's shape profile with the spectrum
+            #(GalSim objects are immutable, so the same object can be drawn
+            #on every detector without copying it)
+            obj = centeredObj.withFlux(gsObject.flux(bandpassName))
 
-                #convolve the object's shape profile with the spectrum
-                obj = obj.withFlux(gsObject.flux(bandpassName))
+            for detector, nameRow, xPix, yPix in zip(detectorList, imageNameRows, xPixList, yPixList):
 
-                self.detectorImages[name] = obj.drawImage(method='phot',
-                                                          gain=detector.photParams.gain,
-                                                          offset=galsim.PositionD(xPix[0]-detector.xCenterPix, yPix[0]-detector.yCenterPix),
-                                                          rng=self._rng,
-                                                          image=self.detectorImages[name],
-                                                          add_to_image=True)
+                #drawImage adds to the image held in self.detectorImages in place
+                obj.drawImage(method='phot',
+                              gain=detector.photParams.gain,
+                              offset=galsim.PositionD(xPix-detector.xCenterPix, yPix-detector.yCenterPix),
+                              rng=self._rng,
+                              image=self.detectorImages[nameRow[iBandpass]],
+                              add_to_image=True)
 
         return outputString
 
@@ -381,44 +438,123 @@ class GalSimInterpreter(object):
 
         Note: parameters that obviously only apply to Sersic profiles will be ignored in the case
         of point sources
+
+        Raises a NotImplementedError if gsObject.galSimType is not a type this class
+        knows how to draw.
         """
 
-        if gsObject.galSimType == 'sersic':
-            centeredObj = self.drawSersic(gsObject)
+        try:
+            drawMethod = self._drawMethods[gsObject.galSimType]
+        except KeyError:
+            raise NotImplementedError("The GalSimInterpreter does not yet have a method to draw %s objects"
+                                      % gsObject.galSimType)
 
-        elif gsObject.galSimType == 'pointSource':
-            centeredObj = self.drawPointSource(gsObject)
-        else:
-            print "Apologies: the GalSimInterpreter does not yet have a method to draw "
-            print gsObject.galSimType
-            print " objects\n"
-            centeredObj = None
+        return drawMethod(gsObject)
 
-        return centeredObj
 
-
-    def writeImages(self, nameRoot=None):
+    def writeImages(self, nameRoot=None, nThreads=1):
         """
         Write the FITS files to disk.
 
         @param [in] nameRoot is a string that will be prepended to the names of the output
         FITS files.  The files will be named like
 
-        @param [out] namesWritten is a list of the names of the FITS files written
-
         nameRoot_detectorName_bandpassName.fits
 
         myImages_R_0_0_S_1_1_y.fits is an example of an image for an LSST-like camera with
         nameRoot = 'myImages'
+
+        @param [in] nThreads is the number of threads over which to spread the
+        writing of the FITS files (default 1, i.e. write them serially)
+
+        @param [out] namesWritten is a list of the names of the FITS files written
         """
         namesWritten = []
+        imageList = []
         for name in self.detectorImages:
             if nameRoot is not None:
                 fileName = nameRoot+'_'+name
             else:
                 fileName = name
-            self.detectorImages[name].write(file_name=fileName)
             namesWritten.append(fileName)
+            imageList.append(self.detectorImages[name])
+
+        self._writeImageList(imageList, namesWritten, nThreads=nThreads)
+
+        return namesWritten
+
+
+    def writeDetectorImages(self, detector, nameRoot=None, nThreads=1):
+        """
+        Write the FITS files associated with a single detector to disk.
+
+        This allows the images of a detector on which nothing else will be drawn to be
+        written out (for instance, from a separate thread) while objects are still
+        being drawn on other detectors.  Anything drawn on the detector after this
+        method is called will not be in the files written, unless they are written again.
+
+        @param [in] detector is an instantiation of GalSimDetector
+
+        @param [in] nameRoot is a string that will be prepended to the names of the output
+        FITS files (see writeImages)
+
+        @param [in] nThreads is the number of threads over which to spread the
+        writing of the FITS files (default 1, i.e. write them serially)
+
+        @param [out] namesWritten is a list of the names of the FITS files written
+        """
+        namesWritten = []
+        imageList = []
+        for name in self._detectorImageNames[self._detectorIndex[detector.name]]:
+            if name in self.detectorImages:
+                if nameRoot is not None:
+                    fileName = nameRoot+'_'+name
+                else:
+                    fileName = name
+                namesWritten.append(fileName)
+                imageList.append(self.detectorImages[name])
+
+        self._writeImageList(imageList, namesWritten, nThreads=nThreads)
 
         return namesWritten
 
+
+    def writeMultiExtensionImage(self, fileName):
+        """
+        Write all of the images to a single multi-extension FITS file, rather than
+        to one FITS file per detector/bandpass combination.  Each image (with its
+        WCS and header cards) goes in its own HDU.
+
+        @param [in] fileName is the name of the FITS file to be written
+
+        @param [out] nameList is a list of the names (as they appear in self.detectorImages)
+        of the images in the file; the image nameList[i] is in HDU i
+        """
+        nameList = list(self.detectorImages)
+        galsim.fits.writeMulti([self.detectorImages[name] for name in nameList], file_name=fileName)
+        return nameList
+
+
+    def _writeImageList(self, imageList, fileNameList, nThreads=1):
+        """
+        Write a list of GalSim images to FITS files.
+
+        @param [in] imageList is a list of GalSim images
+
+        @param [in] fileNameList is a list of the names of the files to which
+        the images in imageList will be written
+
+        @param [in] nThreads is the number of threads over which to spread the
+        writing of the FITS files
+        """
+        if nThreads > 1 and len(imageList) > 1:
+            #each image goes to its own file, so the images can be written independently
+            pool = ThreadPool(min(nThreads, len(imageList)))
+            try:
+                pool.map(lambda args: args[0].write(file_name=args[1]), zip(imageList, fileNameList))
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for image, fileName in zip(imageList, fileNameList):
+                image.write(file_name=fileName)
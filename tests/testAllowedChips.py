@@ -1,6 +1,8 @@
 import unittest
 import numpy as np
 import os
+import shutil
+import tempfile
 import lsst.utils.tests as utilsTests
 
 from lsst.utils import getPackageDir
@@ -51,7 +53,7 @@ class allowedChipsTest(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.scratchDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'scratchSpace')
+        cls.scratchDir = tempfile.mkdtemp(prefix='allowed_chips_test_')
         cls.obs = ObservationMetaData(pointingRA=122.0, pointingDec=-29.1,
                                       mjd=57381.2, rotSkyPos=43.2)
 
@@ -59,8 +61,6 @@ class allowedChipsTest(unittest.TestCase):
         cls.camera = camTestUtils.CameraWrapper().camera
 
         cls.dbFileName = os.path.join(cls.scratchDir, 'allowed_chips_test_db.txt')
-        if os.path.exists(cls.dbFileName):
-            os.unlink(cls.dbFileName)
 
         cls.controlSed = Sed()
         cls.controlSed.readSED_flambda(os.path.join(getPackageDir('sims_sed_library'),
@@ -106,8 +106,8 @@ class allowedChipsTest(unittest.TestCase):
 
     @classmethod
     def tearDownClass(cls):
-        if os.path.exists(cls.dbFileName):
-            os.unlink(cls.dbFileName)
+        shutil.rmtree(cls.scratchDir, ignore_errors=True)
+        del cls.scratchDir
 
     def testCamera(self):
         """
@@ -133,23 +133,7 @@ class allowedChipsTest(unittest.TestCase):
         test_root = os.path.join(self.scratchDir, 'allowed_chip_test_image')
         control_root = os.path.join(self.scratchDir, 'allowed_chip_control_image')
 
-        name_list = []
-        for dd in self.camera:
-            name = dd.getName()
-            name_list.append(name)
-            stripped_name = name.replace(':', '_')
-            stripped_name = stripped_name.replace(',', '_')
-            stripped_name = stripped_name.replace(' ', '_')
-
-            test_image_name = os.path.join(self.scratchDir, test_root+'_'+stripped_name+'_u.fits')
-            control_image_name = os.path.join(self.scratchDir, control_root+'_'+stripped_name+'_u.fits')
-
-            # remove any images that were generated the last time this test
-            # was run
-            if os.path.exists(test_image_name):
-                os.unlink(test_image_name)
-            if os.path.exists(control_image_name):
-                os.unlink(control_image_name)
+        name_list = [dd.getName() for dd in self.camera]
 
         # only allow two chips in the test catalog
         allowed_chips = [name_list[3], name_list[4]]
@@ -201,11 +185,6 @@ class allowedChipsTest(unittest.TestCase):
 
         self.assertEqual(test_image_ct, len(allowed_chips))
 
-        if os.path.exists(test_cat_name):
-            os.unlink(test_cat_name)
-        if os.path.exists(control_cat_name):
-            os.unlink(control_cat_name)
-
 
 def suite():
     utilsTests.init()
@@ -1,5 +1,7 @@
 import numpy
 import os
+import shutil
+import tempfile
 import unittest
 import lsst.utils.tests as utilsTests
 from lsst.utils import getPackageDir
@@ -12,7 +14,7 @@ from lsst.sims.coordUtils import _raDecFromPixelCoords
 
 from lsst.sims.coordUtils.utils import ReturnCamera
 
-from  testUtils import create_text_catalog
+from testUtils import create_text_catalog, remove_file
 
 class fwhmFileDBObj(fileDBObject):
     idColKey = 'test_id'
@@ -44,6 +46,58 @@ class fwhmCat(GalSimStars):
 
 class GalSimFwhmTest(unittest.TestCase):
 
+    def setUp(self):
+        self.scratchDir = tempfile.mkdtemp(prefix='fwhm_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.scratchDir, ignore_errors=True)
+        del self.scratchDir
+
+
+    def walk_profile(self, distanceList, fluxList, half_flux):
+        """
+        Walk along a 1-dimensional profile of an object and find the two
+        points at which the flux crosses half of its maximum.
+
+        @param [in] distanceList is a numpy array of the distances (in arcseconds)
+        of the points on the profile from the brightest pixel
+
+        @param [in] fluxList is a numpy array of the fluxes at the points on the profile
+
+        @param [in] half_flux is half of the maximum flux
+
+        @param [out] distanceToLeft is the (linearly interpolated) distance from the
+        brightest pixel to the point at which the flux rises above half_flux
+
+        @param [out] distanceToRight is the (linearly interpolated) distance from the
+        brightest pixel to the point at which the flux falls back below half_flux
+        """
+        below = fluxList < half_flux
+
+        # the first ix (starting from 1) such that fluxList[ix] is below half_flux
+        # and fluxList[ix+1] is not
+        rising = numpy.flatnonzero(below[1:-1] & ~below[2:]) + 1
+        self.assertGreater(len(rising), 0, msg="profile never rises above half of the maximum flux")
+        ix = rising[0]
+
+        mm = (distanceList[ix]-distanceList[ix+1])/(fluxList[ix]-fluxList[ix+1])
+        bb = distanceList[ix] - mm * fluxList[ix]
+        distanceToLeft = mm*half_flux + bb
+
+        # the first ix after that crossing such that fluxList[ix] is not below
+        # half_flux and fluxList[ix+1] is
+        falling = numpy.flatnonzero(~below[:-1] & below[1:])
+        falling = falling[falling > ix]
+        self.assertGreater(len(falling), 0, msg="profile never falls back below half of the maximum flux")
+        ix = falling[0]
+
+        mm = (distanceList[ix]-distanceList[ix+1])/(fluxList[ix]-fluxList[ix+1])
+        bb = distanceList[ix] - mm * fluxList[ix]
+        distanceToRight = mm*half_flux + bb
+
+        return distanceToLeft, distanceToRight
+
+
     def verify_fwhm(self, fileName, fwhm, detector, camera, obs, epoch=2000.0):
         """
         Read in a FITS image with one object on it and verify that that object
@@ -79,7 +133,7 @@ class GalSimFwhmTest(unittest.TestCase):
 
         # this looks backwards, but remember: the way numpy handles
         # arrays, the first index indicates what row it is in (the y coordinate)
-        _maxPixel = numpy.array([im.argmax()/im.shape[1], im.argmax()%im.shape[1]])
+        _maxPixel = numpy.unravel_index(im.argmax(), im.shape)
         maxPixel = numpy.array([_maxPixel[1], _maxPixel[0]])
 
         raMax, decMax = _raDecFromPixelCoords(maxPixel[:1],
@@ -98,17 +152,16 @@ class GalSimFwhmTest(unittest.TestCase):
             slope = numpy.tan(theta)
 
             if numpy.abs(slope<1.0):
-                xPixList = numpy.array([ix for ix in range(0, im.shape[1]) \
-                                if int(slope*(ix-maxPixel[0]) + maxPixel[1])>=0 and \
-                                int(slope*(ix-maxPixel[0])+maxPixel[1])<im.shape[0]])
-
-                yPixList = numpy.array([int(slope*(ix-maxPixel[0])+maxPixel[1]) for ix in xPixList])
+                xPixList = numpy.arange(0, im.shape[1])
+                yPixList = (slope*(xPixList-maxPixel[0]) + maxPixel[1]).astype(int)
             else:
-                yPixList = numpy.array([iy for iy in range(0, im.shape[0]) \
-                                if int((iy-maxPixel[1])/slope + maxPixel[0])>=0 and \
-                                int((iy-maxPixel[1])/slope + maxPixel[0])<im.shape[1]])
+                yPixList = numpy.arange(0, im.shape[0])
+                xPixList = ((yPixList-maxPixel[1])/slope + maxPixel[0]).astype(int)
 
-                xPixList = numpy.array([int((iy-maxPixel[1])/slope + maxPixel[0]) for iy in yPixList])
+            # keep only the points on the profile that actually fall on the image
+            onImage = (xPixList>=0) & (xPixList<im.shape[1]) & (yPixList>=0) & (yPixList<im.shape[0])
+            xPixList = xPixList[onImage]
+            yPixList = yPixList[onImage]
 
             chipNameList = [detector.getName()]*len(xPixList)
             raList, decList = _raDecFromPixelCoords(xPixList, yPixList, chipNameList,
@@ -116,28 +169,9 @@ class GalSimFwhmTest(unittest.TestCase):
 
             distanceList = arcsecFromRadians(haversine(raList, decList, raMax[0], decMax[0]))
 
-            fluxList = numpy.array([im[iy][ix] for ix,iy in zip(xPixList, yPixList)])
-
-            distanceToLeft = None
-            distanceToRight = None
-
-            for ix in range(1,len(xPixList)):
-                if fluxList[ix]<half_flux and fluxList[ix+1]>=half_flux:
-                    break
-
-            newOrigin = ix+1
+            fluxList = im[yPixList, xPixList]
 
-            mm = (distanceList[ix]-distanceList[ix+1])/(fluxList[ix]-fluxList[ix+1])
-            bb = distanceList[ix] - mm * fluxList[ix]
-            distanceToLeft = mm*half_flux + bb
-
-            for ix in range(newOrigin, len(xPixList)-1):
-                if fluxList[ix]>=half_flux and fluxList[ix+1]<half_flux:
-                    break
-
-            mm = (distanceList[ix]-distanceList[ix+1])/(fluxList[ix]-fluxList[ix+1])
-            bb = distanceList[ix] - mm * fluxList[ix]
-            distanceToRight = mm*half_flux + bb
+            distanceToLeft, distanceToRight = self.walk_profile(distanceList, fluxList, half_flux)
 
             msg = "measured fwhm %e; expected fwhm %e; maxFlux %e\n" % \
             (distanceToLeft+distanceToRight, fwhm, maxFlux)
@@ -149,7 +183,7 @@ class GalSimFwhmTest(unittest.TestCase):
         """
         Test that GalSim generates images with the expected Full Width at Half Maximum.
         """
-        scratchDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'scratchSpace')
+        scratchDir = self.scratchDir
         catName = os.path.join(scratchDir, 'fwhm_test_Catalog.dat')
         imageRoot = os.path.join(scratchDir, 'fwhm_test_Image')
         dbFileName = os.path.join(scratchDir, 'fwhm_test_InputCatalog.dat')
@@ -186,17 +220,9 @@ class GalSimFwhmTest(unittest.TestCase):
 
             self.verify_fwhm(imageName, fwhm, detector, camera, obs)
 
-            if os.path.exists(catName):
-                os.unlink(catName)
-
-            if os.path.exists(imageName):
-                os.unlink(imageName)
-
-
-        if os.path.exists(dbFileName):
-            os.unlink(dbFileName)
-
+            remove_file(catName)
 
+            remove_file(imageName)
 
 
 def suite():
@@ -1,4 +1,6 @@
 import os
+import shutil
+import tempfile
 import numpy as np
 import unittest
 import lsst.utils.tests as utilsTests
@@ -48,6 +50,32 @@ class fitsHeaderCatalog(GalSimStars):
 
 class FitsHeaderTest(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        # building the cameras is expensive, so only do it once
+        cls.lsstCamera = LsstSimMapper().camera
+        cameraDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'cameraData')
+        cls.cartoonCamera = ReturnCamera(cameraDir)
+
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.lsstCamera
+        del cls.cartoonCamera
+
+
+    def setUp(self):
+        # write the catalogs and images to a private temporary directory
+        # (typically on a local or memory-backed file system); this also
+        # takes care of cleaning them up
+        self.scratchDir = tempfile.mkdtemp(prefix='fits_test_')
+
+
+    def tearDown(self):
+        shutil.rmtree(self.scratchDir, ignore_errors=True)
+        del self.scratchDir
+
+
     def testFitsHeader(self):
         """
         Create a test image with the LSST camera and with the
@@ -56,12 +84,7 @@ class FitsHeaderTest(unittest.TestCase):
         image created with the cartoon camera does not
         """
 
-        lsstCamera = LsstSimMapper().camera
-        cameraDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'cameraData')
-        cartoonCamera = ReturnCamera(cameraDir)
-
-        outputDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests',
-                                 'scratchSpace')
+        outputDir = self.scratchDir
 
 
         lsst_cat_name = os.path.join(outputDir, 'fits_test_lsst_cat.txt')
@@ -81,56 +104,53 @@ class FitsHeaderTest(unittest.TestCase):
 
         # first test the lsst camera
         lsstCat = fitsHeaderCatalog(db, obs_metadata=obs)
-        lsstCat.camera = lsstCamera
+        lsstCat.camera = self.lsstCamera
         lsstCat.PSF = SNRdocumentPSF()
         lsstCat.write_catalog(lsst_cat_name)
-        lsstCat.write_images(nameRoot=lsst_cat_root)
-
-        list_of_files = os.listdir(outputDir)
-        ct = 0
-        for file_name in list_of_files:
-            true_name = os.path.join(outputDir, file_name)
-            if lsst_cat_root in true_name:
+        written_files = lsstCat.write_images(nameRoot=lsst_cat_root)
+
+        self.assertGreater(len(written_files), 0)
+        for true_name in written_files:
+            header = fits.getheader(true_name, 0, memmap=False, do_not_scale_image_data=True)
+            self.assertIn('CHIPID', header)
+            self.assertIn('OBSID', header)
+            self.assertIn('OUTFILE', header)
+            self.assertEqual(header['OBSID'], 112)
+            self.assertEqual(header['CHIPID'], 'R22_S11')
+            self.assertEqual(header['OUTFILE'], 'lsst_e_112_f0_R22_S11_E000')
+
+        # the same cards should be in each HDU when all of the images
+        # are written to a single multi-extension FITS file
+        mef_name = os.path.join(outputDir, 'fits_test_lsst_mef.fits')
+        name_list = lsstCat.write_multi_extension_image(mef_name)
+        self.assertEqual(len(name_list), len(written_files))
+        # open the file once and only read the headers (HDUs are loaded
+        # as they are iterated over; the image data are never touched)
+        hdu_list = fits.open(mef_name, memmap=False, do_not_scale_image_data=True)
+        try:
+            ct = 0
+            for hdu in hdu_list:
                 ct += 1
-                fitsTest = fits.open(true_name)
-                header = fitsTest[0].header
-                self.assertIn('CHIPID', header)
-                self.assertIn('OBSID', header)
-                self.assertIn('OUTFILE', header)
-                self.assertEqual(header['OBSID'], 112)
-                self.assertEqual(header['CHIPID'], 'R22_S11')
-                self.assertEqual(header['OUTFILE'], 'lsst_e_112_f0_R22_S11_E000')
-                os.unlink(true_name)
-
-        self.assertGreater(ct, 0)
-        if os.path.exists(lsst_cat_name):
-            os.unlink(lsst_cat_name)
+                self.assertEqual(hdu.header['OBSID'], 112)
+                self.assertEqual(hdu.header['CHIPID'], 'R22_S11')
+                self.assertEqual(hdu.header['OUTFILE'], 'lsst_e_112_f0_R22_S11_E000')
+        finally:
+            hdu_list.close()
+        self.assertEqual(ct, len(name_list))
 
         # now test with the cartoon camera
         cartoonCat = fitsHeaderCatalog(db, obs_metadata=obs)
-        cartoonCat.camera = cartoonCamera
+        cartoonCat.camera = self.cartoonCamera
         cartoonCat.PSF = SNRdocumentPSF()
         cartoonCat.write_catalog(cartoon_cat_name)
-        cartoonCat.write_images(nameRoot=cartoon_cat_root)
-        list_of_files = os.listdir(outputDir)
-        ct = 0
-        for file_name in list_of_files:
-            true_name = os.path.join(outputDir, file_name)
-            if cartoon_cat_root in true_name:
-                ct += 1
-                fitsTest = fits.open(true_name)
-                header = fitsTest[0].header
-                self.assertNotIn('CHIPID', header)
-                self.assertNotIn('OBSID', header)
-                self.assertNotIn('OUTFILE', header)
-                os.unlink(true_name)
-
-        self.assertGreater(ct, 0)
-        if os.path.exists(cartoon_cat_name):
-            os.unlink(cartoon_cat_name)
-
-        if os.path.exists(dbFileName):
-            os.unlink(dbFileName)
+        written_files = cartoonCat.write_images(nameRoot=cartoon_cat_root)
+
+        self.assertGreater(len(written_files), 0)
+        for true_name in written_files:
+            header = fits.getheader(true_name, 0, memmap=False, do_not_scale_image_data=True)
+            self.assertNotIn('CHIPID', header)
+            self.assertNotIn('OBSID', header)
+            self.assertNotIn('OUTFILE', header)
 
 
 def suite():
@@ -0,0 +1,173 @@
+import unittest
+import copy
+import pickle
+import numpy
+import lsst.utils.tests as utilsTests
+from lsst.sims.utils import arcsecFromRadians
+from lsst.sims.GalSimInterface import GalSimCelestialObject
+
+class GalSimCelestialObjectTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        numpy.random.seed(88)
+        cls.nObj = 5
+        cls.sedList = ['sed_%d.dat' % ix for ix in range(cls.nObj)]
+        cls.ra = numpy.random.random_sample(cls.nObj)*2.0*numpy.pi
+        cls.dec = (numpy.random.random_sample(cls.nObj)-0.5)*numpy.pi
+        cls.xPupil = (numpy.random.random_sample(cls.nObj)-0.5)*0.01
+        cls.yPupil = (numpy.random.random_sample(cls.nObj)-0.5)*0.01
+        cls.hlr = numpy.random.random_sample(cls.nObj)*1.0e-5
+        cls.minorAxis = numpy.random.random_sample(cls.nObj)*1.0e-5
+        cls.majorAxis = cls.minorAxis + numpy.random.random_sample(cls.nObj)*1.0e-5
+        cls.positionAngle = numpy.random.random_sample(cls.nObj)*numpy.pi
+        cls.sindex = numpy.random.random_sample(cls.nObj)*4.0
+        cls.bandpassNames = ['u', 'g', 'r']
+        cls.fluxArray = numpy.random.random_sample((cls.nObj, len(cls.bandpassNames)))*1.0e5
+
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.nObj
+        del cls.sedList
+        del cls.ra
+        del cls.dec
+        del cls.xPupil
+        del cls.yPupil
+        del cls.hlr
+        del cls.minorAxis
+        del cls.majorAxis
+        del cls.positionAngle
+        del cls.sindex
+        del cls.bandpassNames
+        del cls.fluxArray
+
+
+    def makeObject(self, ix):
+        """
+        Use the constructor to make a GalSimCelestialObject out of the
+        ixth element of the test data
+        """
+        fluxDict = dict((bb, self.fluxArray[ix][jx]) for jx, bb in enumerate(self.bandpassNames))
+        return GalSimCelestialObject('sersic', self.sedList[ix], self.ra[ix], self.dec[ix],
+                                     self.xPupil[ix], self.yPupil[ix], self.hlr[ix],
+                                     self.minorAxis[ix], self.majorAxis[ix],
+                                     self.positionAngle[ix], self.sindex[ix], fluxDict)
+
+
+    def assertObjectsEqual(self, obj1, obj2):
+        """
+        Assert that two GalSimCelestialObjects carry the same data
+        """
+        for name in ('galSimType', 'sed', 'raRadians', 'decRadians',
+                     'xPupilRadians', 'yPupilRadians', 'halfLightRadiusRadians',
+                     'minorAxisRadians', 'majorAxisRadians', 'positionAngleRadians',
+                     'sindex', 'xPupilArcsec', 'yPupilArcsec', 'halfLightRadiusArcsec'):
+
+            self.assertEqual(getattr(obj1, name), getattr(obj2, name), msg=name)
+
+        for bb in self.bandpassNames:
+            self.assertEqual(obj1.flux(bb), obj2.flux(bb), msg=bb)
+
+
+    def testReadOnly(self):
+        """
+        Test that the attributes of a GalSimCelestialObject cannot be set
+        """
+        obj = self.makeObject(0)
+        for name in ('galSimType', 'sed', 'xPupilRadians', 'xPupilArcsec', 'newAttribute'):
+            self.assertRaises(RuntimeError, setattr, obj, name, 1.0)
+
+        self.assertEqual(obj.galSimType, 'sersic')
+        self.assertEqual(obj.xPupilRadians, self.xPupil[0])
+
+
+    def testArcsec(self):
+        """
+        Test that the arcsecond values are calculated (correctly) the
+        first time they are asked for
+        """
+        obj = self.makeObject(1)
+        self.assertIsNone(obj._xPupilArcsec)
+        self.assertIsNone(obj._yPupilArcsec)
+        self.assertIsNone(obj._halfLightRadiusArcsec)
+
+        self.assertAlmostEqual(obj.xPupilArcsec, arcsecFromRadians(self.xPupil[1]), 10)
+        self.assertAlmostEqual(obj.yPupilArcsec, arcsecFromRadians(self.yPupil[1]), 10)
+        self.assertAlmostEqual(obj.halfLightRadiusArcsec, arcsecFromRadians(self.hlr[1]), 10)
+
+        self.assertEqual(obj._xPupilArcsec, obj.xPupilArcsec)
+        self.assertEqual(obj._yPupilArcsec, obj.yPupilArcsec)
+        self.assertEqual(obj._halfLightRadiusArcsec, obj.halfLightRadiusArcsec)
+
+
+    def testFlux(self):
+        """
+        Test that flux() returns the fluxes passed in and raises a
+        RuntimeError when asked for a band that does not exist
+        """
+        obj = self.makeObject(2)
+        for jx, bb in enumerate(self.bandpassNames):
+            self.assertEqual(obj.flux(bb), self.fluxArray[2][jx])
+
+        self.assertRaises(RuntimeError, obj.flux, 'y')
+
+
+    def testFromArrays(self):
+        """
+        Test that fromArrays produces the same objects as the constructor
+        """
+        objList = GalSimCelestialObject.fromArrays('sersic', self.sedList, self.ra, self.dec,
+                                                   self.xPupil, self.yPupil, self.hlr,
+                                                   self.minorAxis, self.majorAxis,
+                                                   self.positionAngle, self.sindex,
+                                                   self.bandpassNames, self.fluxArray)
+
+        self.assertEqual(len(objList), self.nObj)
+        for ix, obj in enumerate(objList):
+            self.assertIsInstance(obj, GalSimCelestialObject)
+            control = self.makeObject(ix)
+            self.assertEqual(obj.galSimType, control.galSimType)
+            self.assertEqual(obj.sed, control.sed)
+            for name in ('raRadians', 'decRadians', 'xPupilRadians', 'yPupilRadians',
+                         'halfLightRadiusRadians', 'minorAxisRadians', 'majorAxisRadians',
+                         'positionAngleRadians', 'sindex', 'xPupilArcsec', 'yPupilArcsec',
+                         'halfLightRadiusArcsec'):
+
+                self.assertAlmostEqual(getattr(obj, name), getattr(control, name), 10, msg=name)
+
+            for bb in self.bandpassNames:
+                self.assertAlmostEqual(obj.flux(bb), control.flux(bb), 10, msg=bb)
+
+            self.assertRaises(RuntimeError, setattr, obj, 'sed', None)
+
+
+    def testCopyAndPickle(self):
+        """
+        Test that GalSimCelestialObjects can be copied and pickled
+        """
+        obj = self.makeObject(3)
+        # calculate one of the arcsecond values, so that both states
+        # of the lazy values get carried through
+        obj.xPupilArcsec
+
+        for newObj in (copy.copy(obj), copy.deepcopy(obj),
+                       pickle.loads(pickle.dumps(obj)),
+                       pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))):
+
+            self.assertIsNot(newObj, obj)
+            self.assertObjectsEqual(newObj, obj)
+            self.assertRaises(RuntimeError, setattr, newObj, 'sed', None)
+
+
+def suite():
+    utilsTests.init()
+    suites = []
+    suites += unittest.makeSuite(GalSimCelestialObjectTest)
+
+    return unittest.TestSuite(suites)
+
+def run(shouldExit = False):
+    utilsTests.run(suite(), shouldExit)
+if __name__ == "__main__":
+    run(True)
@@ -1,74 +1,102 @@
 import unittest
 import os
 import numpy
+import galsim
 from lsst.utils import getPackageDir
 import lsst.utils.tests as utilsTests
 
 from lsst.sims.utils import ObservationMetaData
-from lsst.sims.photUtils import PhotometricParameters
+from lsst.sims.photUtils import PhotometricParameters, BandpassDict
 from lsst.sims.coordUtils.utils import ReturnCamera
+from lsst.obs.lsstSim import LsstSimMapper
 from lsst.sims.coordUtils import _raDecFromPixelCoords, \
                                  pupilCoordsFromPixelCoords
-from lsst.sims.GalSimInterface import GalSimDetector
+from lsst.sims.GalSimInterface import GalSimDetector, GalSimInterpreter
+import lsst.sims.GalSimInterface.galSimDetector as galSimDetector
 
 class GalSimDetectorTest(unittest.TestCase):
 
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         baseDir = os.path.join(getPackageDir('sims_GalSimInterface'),
                                'tests', 'cameraData')
 
-        self.camera = ReturnCamera(baseDir)
+        cls.camera = ReturnCamera(baseDir)
 
         ra = 145.0
         dec = -73.0
-        self.epoch = 2000.0
+        cls.epoch = 2000.0
         mjd = 49250.0
         rotSkyPos = 45.0
-        self.obs = ObservationMetaData(pointingRA=ra,
-                                       pointingDec=dec,
-                                       boundType='circle',
-                                       boundLength=1.0,
-                                       mjd=mjd,
-                                       rotSkyPos=rotSkyPos)
+        cls.obs = ObservationMetaData(pointingRA=ra,
+                                      pointingDec=dec,
+                                      boundType='circle',
+                                      boundLength=1.0,
+                                      mjd=mjd,
+                                      rotSkyPos=rotSkyPos)
 
+        cls.photParams = PhotometricParameters()
 
-    def testContainsRaDec(self):
-        """
-        Test whether or not the method containsRaDec correctly identifies
-        RA and Dec that fall inside and outside the detector
+        # none of the tests modify the detector, so they can all share it
+        cls.gsdet = GalSimDetector(cls.camera[0], cls.camera,
+                                   cls.obs, cls.epoch,
+                                   photParams=cls.photParams)
+
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.gsdet
+        del cls.photParams
+        del cls.obs
+        del cls.epoch
+        del cls.camera
+
+
+    def cornerTestPoints(self, gsdet):
         """
+        Return pixel coordinates of points at and just outside of the lower left
+        and upper right corners of a GalSimDetector.
 
-        photParams = PhotometricParameters()
-        gsdet = GalSimDetector(self.camera[0], self.camera, \
-                               self.obs, self.epoch,
-                               photParams=photParams)
+        @param [in] gsdet is the GalSimDetector
 
-        xxList = [gsdet.xMinPix, gsdet.xMaxPix]
-        yyList = [gsdet.yMinPix, gsdet.yMaxPix]
-        dxList = [-1.0, 1.0]
-        dyList = [-1.0, 1.0]
+        @param [out] xPixList is a numpy array of the x pixel coordinates of the points
 
-        xPixList = []
-        yPixList = []
-        correctAnswer = []
+        @param [out] yPixList is a numpy array of the y pixel coordinates of the points
 
-        for xx, yy, dx, dy in zip(xxList, yyList, dxList, dyList):
-            xPixList.append(xx)
-            yPixList.append(yy)
-            correctAnswer.append(True)
+        @param [out] correctAnswer is a numpy array of booleans indicating whether
+        or not each point is on the detector
+        """
+        xx = numpy.array([gsdet.xMinPix, gsdet.xMaxPix], dtype=float)
+        yy = numpy.array([gsdet.yMinPix, gsdet.yMaxPix], dtype=float)
+        dd = numpy.array([-1.0, 1.0])
 
-            xPixList.append(xx+dx)
-            yPixList.append(yy)
-            correctAnswer.append(False)
+        # for each corner: the corner itself, then a point displaced
+        # off of the detector in x, then one displaced off of it in y
+        xPixList = numpy.empty(3*len(xx))
+        yPixList = numpy.empty(3*len(yy))
+        xPixList[0::3] = xx
+        yPixList[0::3] = yy
+        xPixList[1::3] = xx + dd
+        yPixList[1::3] = yy
+        xPixList[2::3] = xx
+        yPixList[2::3] = yy + dd
 
-            xPixList.append(xx)
-            yPixList.append(yy+dy)
-            correctAnswer.append(False)
+        correctAnswer = numpy.zeros(len(xPixList), dtype=bool)
+        correctAnswer[0::3] = True
 
+        return xPixList, yPixList, correctAnswer
 
-        nameList = [gsdet.name]*len(xPixList)
-        xPixList = numpy.array(xPixList)
-        yPixList = numpy.array(yPixList)
+
+    def testContainsRaDec(self):
+        """
+        Test whether or not the method containsRaDec correctly identifies
+        RA and Dec that fall inside and outside the detector
+        """
+
+        gsdet = self.gsdet
+
+        xPixList, yPixList, correctAnswer = self.cornerTestPoints(gsdet)
+        nameList = numpy.array([gsdet.name]*len(xPixList))
 
         raList, decList = _raDecFromPixelCoords(xPixList, yPixList,
                                                 nameList,
@@ -78,8 +106,9 @@ class GalSimDetectorTest(unittest.TestCase):
 
         testAnswer = gsdet.containsRaDec(raList, decList)
 
-        for c, t in zip(correctAnswer, testAnswer):
-            self.assertIs(c, t)
+        self.assertIsInstance(testAnswer, numpy.ndarray)
+        self.assertEqual(testAnswer.dtype, numpy.bool_)
+        numpy.testing.assert_array_equal(testAnswer, correctAnswer)
 
 
     def testContainsPupilCoordinates(self):
@@ -88,48 +117,194 @@ class GalSimDetectorTest(unittest.TestCase):
         RA and Dec that fall inside and outside the detector
         """
 
-        photParams = PhotometricParameters()
-        gsdet = GalSimDetector(self.camera[0], self.camera, \
-                               self.obs, self.epoch,
-                               photParams=photParams)
+        gsdet = self.gsdet
 
-        xxList = [gsdet.xMinPix, gsdet.xMaxPix]
-        yyList = [gsdet.yMinPix, gsdet.yMaxPix]
-        dxList = [-1.0, 1.0]
-        dyList = [-1.0, 1.0]
+        xPixList, yPixList, correctAnswer = self.cornerTestPoints(gsdet)
+        nameList = numpy.array([gsdet.name]*len(xPixList))
 
-        xPixList = []
-        yPixList = []
-        correctAnswer = []
+        xPupilList, yPupilList = \
+               pupilCoordsFromPixelCoords(xPixList, yPixList,
+                                          nameList,
+                                          camera=self.camera)
 
-        for xx, yy, dx, dy in zip(xxList, yyList, dxList, dyList):
-            xPixList.append(xx)
-            yPixList.append(yy)
-            correctAnswer.append(True)
 
-            xPixList.append(xx+dx)
-            yPixList.append(yy)
-            correctAnswer.append(False)
+        testAnswer = gsdet.containsPupilCoordinates(xPupilList, yPupilList)
 
-            xPixList.append(xx)
-            yPixList.append(yy+dy)
-            correctAnswer.append(False)
+        self.assertIsInstance(testAnswer, numpy.ndarray)
+        self.assertEqual(testAnswer.dtype, numpy.bool_)
+        numpy.testing.assert_array_equal(testAnswer, correctAnswer)
 
+    def testWcsRoundTrip(self):
+        """
+        Test that the GalSim WCS's _xy method inverts its _radec method, for
+        both scalar and numpy array inputs, on the detector's WCS and on a
+        WCS whose origin has been moved with _newOrigin
+        """
 
-        nameList = [gsdet.name]*len(xPixList)
-        xPixList = numpy.array(xPixList)
-        yPixList = numpy.array(yPixList)
+        gsdet = self.gsdet
 
-        xPupilList, yPupilList = \
-               pupilCoordsFromPixelCoords(xPixList, yPixList,
-                                          nameList,
-                                          camera=self.camera)
+        numpy.random.seed(17)
+        xPixList = numpy.random.random_sample(10)*(gsdet.xMaxPix-gsdet.xMinPix) + gsdet.xMinPix
+        yPixList = numpy.random.random_sample(10)*(gsdet.yMaxPix-gsdet.yMinPix) + gsdet.yMinPix
 
+        wcsList = [gsdet.wcs,
+                   gsdet.wcs._newOrigin(galsim.PositionD(x=gsdet.xCenterPix, y=gsdet.yCenterPix))]
 
-        testAnswer = gsdet.containsPupilCoordinates(xPupilList, yPupilList)
+        for wcs in wcsList:
+            # the WCS methods take pixel coordinates with crpix subtracted
+            xList = xPixList - wcs.afw_crpix1
+            yList = yPixList - wcs.afw_crpix2
+
+            raList, decList = wcs._radec(xList, yList)
+            self.assertIsInstance(raList, numpy.ndarray)
+            self.assertIsInstance(decList, numpy.ndarray)
+
+            xTest, yTest = wcs._xy(raList, decList)
+            self.assertIsInstance(xTest, numpy.ndarray)
+            self.assertIsInstance(yTest, numpy.ndarray)
+            numpy.testing.assert_array_almost_equal(xTest, xList, 3)
+            numpy.testing.assert_array_almost_equal(yTest, yList, 3)
+
+            for xx, yy in zip(xList.tolist(), yList.tolist()):
+                ra, dec = wcs._radec(xx, yy)
+                self.assertNotIsInstance(ra, numpy.ndarray)
+                self.assertNotIsInstance(dec, numpy.ndarray)
+
+                xTest, yTest = wcs._xy(ra, dec)
+                self.assertNotIsInstance(xTest, numpy.ndarray)
+                self.assertNotIsInstance(yTest, numpy.ndarray)
+                self.assertAlmostEqual(xTest, xx, 3)
+                self.assertAlmostEqual(yTest, yy, 3)
+
+
+    def testWcsCache(self):
+        """
+        Test that detectors constructed for the same camera and pointing
+        share a TAN-SIP WCS fit (even if their ObservationMetaData are
+        different instantiations), and that detectors constructed for a
+        different pointing or MJD do not
+        """
+
+        def makeDetector(obs):
+            return GalSimDetector(self.camera[0], self.camera, obs, self.epoch,
+                                  photParams=self.photParams)
+
+        # build every ObservationMetaData from the same literal degree values
+        # as self.obs, so that matching pointings have identical radian values
+        def makeObs(pointingRA=145.0, mjd=49250.0):
+            return ObservationMetaData(pointingRA=pointingRA,
+                                       pointingDec=-73.0,
+                                       boundType='circle',
+                                       boundLength=1.0,
+                                       mjd=mjd,
+                                       rotSkyPos=45.0)
+
+        controlWcs = makeDetector(self.obs).wcs
+
+        sameWcs = makeDetector(self.obs).wcs
+        self.assertIs(sameWcs._tanSipWcs, controlWcs._tanSipWcs)
+
+        samePointingWcs = makeDetector(makeObs()).wcs
+        self.assertIs(samePointingWcs._tanSipWcs, controlWcs._tanSipWcs)
+
+        newPointingWcs = makeDetector(makeObs(pointingRA=146.0)).wcs
+        self.assertIsNot(newPointingWcs._tanSipWcs, controlWcs._tanSipWcs)
+        self.assertNotAlmostEqual(newPointingWcs.fitsHeader.get('CRVAL1'),
+                                  controlWcs.fitsHeader.get('CRVAL1'), 6)
+
+        newMjdWcs = makeDetector(makeObs(mjd=49251.0)).wcs
+        self.assertIsNot(newMjdWcs._tanSipWcs, controlWcs._tanSipWcs)
+        self.assertIsNot(newMjdWcs._tanSipWcs, newPointingWcs._tanSipWcs)
+        self.assertNotAlmostEqual(newMjdWcs.fitsHeader.get('MJD-OBS'),
+                                  controlWcs.fitsHeader.get('MJD-OBS'), 6)
+
+    def testWcsCacheEviction(self):
+        """
+        Test that, once the cache of TAN-SIP WCS fits is full, the least
+        recently used fit is the one that gets discarded
+        """
+
+        def makeWcs(mjd):
+            obs = ObservationMetaData(pointingRA=145.0, pointingDec=-73.0,
+                                      boundType='circle', boundLength=1.0,
+                                      mjd=mjd, rotSkyPos=45.0)
+            return GalSimDetector(self.camera[0], self.camera, obs, self.epoch,
+                                  photParams=self.photParams).wcs._tanSipWcs
+
+        cacheSize = galSimDetector._tanSipWcsCacheSize
+        galSimDetector._tanSipWcsCache.clear()
+        galSimDetector._tanSipWcsCacheSize = 2
+        try:
+            fitA = makeWcs(49300.0)
+            fitB = makeWcs(49301.0)
+            self.assertIs(makeWcs(49300.0), fitA) # A is now more recently used than B
+            makeWcs(49302.0) # this should push B out of the cache
+            self.assertEqual(len(galSimDetector._tanSipWcsCache), 2)
+            self.assertIs(makeWcs(49300.0), fitA)
+            self.assertIsNot(makeWcs(49301.0), fitB)
+        finally:
+            galSimDetector._tanSipWcsCacheSize = cacheSize
+            galSimDetector._tanSipWcsCache.clear()
+
+
+    def testInitializeWcs(self):
+        """
+        Test that GalSimInterpreter.initializeWcs (serially and with several
+        threads) constructs the WCS of every detector, and that those WCSs
+        have the same FITS headers as WCSs constructed the first time they
+        are asked for.
+
+        The cartoon camera only has one detector, so this test uses several
+        detectors of the LSST camera; with three threads, their TAN-SIP WCSs
+        are fit at the same time.
+        """
+
+        camera = LsstSimMapper().camera
+        afwDetectorList = [camera['R:2,2 S:%d,%d' % (ix, iy)]
+                           for ix in range(3) for iy in range(3)]
+
+        # the LSST FITS headers need a single bandpass
+        obs = ObservationMetaData(pointingRA=self.obs.pointingRA,
+                                  pointingDec=self.obs.pointingDec,
+                                  boundType='circle',
+                                  boundLength=1.0,
+                                  mjd=49250.0,
+                                  rotSkyPos=self.obs.rotSkyPos,
+                                  bandpassName='r')
+
+        def makeDetectors():
+            return [GalSimDetector(afwDetector, camera, obs, self.epoch,
+                                   photParams=self.photParams)
+                    for afwDetector in afwDetectorList]
+
+        bandpassDict = BandpassDict.loadTotalBandpassesFromFiles(bandpassNames=['u', 'g'])
+
+        # make sure none of the WCSs below come out of the cache of TAN-SIP fits
+        galSimDetector._tanSipWcsCache.clear()
+        controlHeaders = [det.wcs.fitsHeader for det in makeDetectors()]
+
+        for nThreads in (1, 3):
+            galSimDetector._tanSipWcsCache.clear()
+            detList = makeDetectors()
+            for det in detList:
+                self.assertIsNone(det._wcs)
+
+            interpreter = GalSimInterpreter(obs_metadata=obs, detectors=detList,
+                                            bandpassDict=bandpassDict, epoch=self.epoch)
+            interpreter.initializeWcs(nThreads=nThreads)
+
+            self.assertEqual(len(detList), len(controlHeaders))
+            for det, controlHeader in zip(detList, controlHeaders):
+                self.assertIsNotNone(det._wcs)
+                self.assertIs(det.initializeWcs(), det._wcs)
+                testHeader = det._wcs.fitsHeader
+                self.assertEqual(testHeader.getOrderedNames(), controlHeader.getOrderedNames())
+                for name in controlHeader.getOrderedNames():
+                    self.assertEqual(testHeader.get(name), controlHeader.get(name),
+                                     msg='%s %s' % (det.name, name))
+
+        galSimDetector._tanSipWcsCache.clear()
 
-        for c, t in zip(correctAnswer, testAnswer):
-            self.assertIs(c, t)
 
 def suite():
     utilsTests.init()
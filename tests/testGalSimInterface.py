@@ -13,11 +13,13 @@ from lsst.sims.coordUtils import pixelCoordsFromPupilCoords
 from lsst.sims.catalogs.measures.instance import InstanceCatalog
 from lsst.sims.catalogs.generation.utils import makePhoSimTestDB
 from lsst.sims.utils import ObservationMetaData
+from lsst.sims.GalSimInterface.galSimInterpreter import _intervalsOverlap
 from lsst.sims.GalSimInterface import GalSimGalaxies, GalSimStars, GalSimAgn, \
                                                SNRdocumentPSF, ExampleCCDNoise
 from lsst.sims.catUtils.utils import calcADUwrapper, testGalaxyBulgeDBObj, testGalaxyDiskDBObj, \
                                      testGalaxyAgnDBObj, testStarsDBObj
 import lsst.afw.image as afwImage
+from testUtils import remove_file
 
 class testGalaxyCatalog(GalSimGalaxies):
     """
@@ -138,8 +140,7 @@ class GalSimInterfaceTest(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls.dbName = 'galSimTestDB.db'
-        if os.path.exists(cls.dbName):
-            os.unlink(cls.dbName)
+        remove_file(cls.dbName)
 
         displacedRA = numpy.array([72.0/3600.0])
         displacedDec = numpy.array([0.0])
@@ -160,8 +161,7 @@ class GalSimInterfaceTest(unittest.TestCase):
 
     @classmethod
     def tearDownClass(cls):
-        if os.path.exists(cls.dbName):
-            os.unlink(cls.dbName)
+        remove_file(cls.dbName)
 
         del cls.dbName
         del cls.driver
@@ -423,8 +423,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         cat = testGalaxyCatalog(gals, obs_metadata = self.obs_metadata)
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='bulge')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
 
     def testGalaxyDisks(self):
@@ -436,8 +435,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         cat = testGalaxyCatalog(gals, obs_metadata = self.obs_metadata)
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='disk')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
 
     def testStars(self):
@@ -449,8 +447,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         cat = testStarCatalog(stars, obs_metadata = self.obs_metadata)
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='stars')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
 
     def testFakeBandpasses(self):
@@ -477,8 +474,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         self.catalogTester(catName=catName, catalog=cat, nameRoot='fakeBandpass',
                            bandpassDir=bandpassDir, bandpassRoot='fakeTotal_')
 
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
     def testFakeSeds(self):
         """
@@ -506,8 +502,7 @@ class GalSimInterfaceTest(unittest.TestCase):
                            bandpassDir=bandpassDir, bandpassRoot='fakeTotal_',
                            sedDir=sedDir)
 
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
 
 
@@ -520,8 +515,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         cat = testAgnCatalog(agn, obs_metadata = self.obs_metadata)
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='agn')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
 
     def testPSFimages(self):
@@ -534,8 +528,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         cat = psfCatalog(gals, obs_metadata = self.obs_metadata)
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='psf')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
 
     def testBackground(self):
@@ -548,8 +541,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         cat = backgroundCatalog(gals, obs_metadata = self.obs_metadata)
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='background')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
 
     def testNoisyCatalog(self):
@@ -571,10 +563,8 @@ class GalSimInterfaceTest(unittest.TestCase):
 
         self.compareCatalogs(cleanCat, noisyCat, PhotometricParameters().gain, PhotometricParameters().readnoise)
 
-        if os.path.exists(noisyCatName):
-            os.unlink(noisyCatName)
-        if os.path.exists(cleanCatName):
-            os.unlink(cleanCatName)
+        remove_file(noisyCatName)
+        remove_file(cleanCatName)
 
 
     def testNoise(self):
@@ -631,8 +621,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         dbName = 'galSimTestMultipleDB.db'
         driver = 'sqlite'
 
-        if os.path.exists(dbName):
-            os.unlink(dbName)
+        remove_file(dbName)
 
         displacedRA = numpy.array([72.0/3600.0, 55.0/3600.0, 75.0/3600.0])
         displacedDec = numpy.array([0.0, 15.0/3600.0, -15.0/3600.0])
@@ -646,19 +635,50 @@ class GalSimInterfaceTest(unittest.TestCase):
         catName = 'multipleCatalog.sav'
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='multiple')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
         stars = testStarsDBObj(driver=driver, database=dbName)
         cat = testStarCatalog(stars, obs_metadata=obs_metadata)
         catName = 'multipleStarCatalog.sav'
         cat.write_catalog(catName)
         self.catalogTester(catName=catName, catalog=cat, nameRoot='multipleStars')
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(catName)
 
-        if os.path.exists(dbName):
-            os.unlink(dbName)
+        remove_file(dbName)
+
+
+    def testWriteDetectorImages(self):
+        """
+        Test that writeDetectorImages writes exactly the images of the given detector
+        (and that writing them with several threads gives the same files)
+        """
+        driver = 'sqlite'
+        nameRoot = 'writeDetector'
+        stars = testStarsDBObj(driver=driver, database=self.dbName)
+        cat = testStarCatalog(stars, obs_metadata=self.obs_metadata)
+        catName = 'writeDetectorCatalog.sav'
+        cat.write_catalog(catName)
+
+        allNames = cat.write_images(nameRoot=nameRoot, nThreads=3)
+        self.assertGreater(len(allNames), 0)
+        for name in allNames:
+            self.assertTrue(os.path.exists(name))
+            os.unlink(name)
+
+        detectorNames = []
+        for detector in cat.galSimInterpreter.detectors:
+            namesWritten = cat.galSimInterpreter.writeDetectorImages(detector, nameRoot=nameRoot, nThreads=2)
+            for name in namesWritten:
+                self.assertTrue(os.path.exists(name))
+                self.assertIn(detector.fileName, name)
+            detectorNames += namesWritten
+
+        self.assertEqual(sorted(detectorNames), sorted(allNames))
+
+        for name in detectorNames:
+            remove_file(name)
+
+        remove_file(catName)
 
 
     def testCompoundFitsFiles(self):
@@ -667,8 +687,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         """
         driver = 'sqlite'
         dbName1 = 'galSimTestCompound1DB.db'
-        if os.path.exists(dbName1):
-            os.unlink(dbName1)
+        remove_file(dbName1)
 
         displacedRA = numpy.array([72.0/3600.0, 55.0/3600.0, 75.0/3600.0])
         displacedDec = numpy.array([0.0, 15.0/3600.0, -15.0/3600.0])
@@ -678,8 +697,7 @@ class GalSimInterfaceTest(unittest.TestCase):
                                          m5=self.m5, seeing=self.seeing)
 
         dbName2 = 'galSimTestCompound2DB.db'
-        if os.path.exists(dbName2):
-            os.unlink(dbName2)
+        remove_file(dbName2)
 
         displacedRA = numpy.array([55.0/3600.0, 60.0/3600.0, 62.0/3600.0])
         displacedDec = numpy.array([-3.0/3600.0, 10.0/3600.0, 10.0/3600.0])
@@ -699,12 +717,9 @@ class GalSimInterfaceTest(unittest.TestCase):
         cat2.write_catalog(catName, write_header=False, write_mode='a')
         self.catalogTester(catName=catName, catalog=cat2, nameRoot='compound')
 
-        if os.path.exists(dbName1):
-            os.unlink(dbName1)
-        if os.path.exists(dbName2):
-            os.unlink(dbName2)
-        if os.path.exists(catName):
-            os.unlink(catName)
+        remove_file(dbName1)
+        remove_file(dbName2)
+        remove_file(catName)
 
 
     def testPlacement(self):
@@ -730,8 +745,7 @@ class GalSimInterfaceTest(unittest.TestCase):
         catSize = 3
         dbName = 'galSimPlacementTestDB.db'
         driver = 'sqlite'
-        if os.path.exists(dbName):
-            os.unlink(dbName)
+        remove_file(dbName)
 
         displacedRA = (-40.0 + numpy.random.sample(catSize)*(120.0))/3600.0
         displacedDec = (-20.0 + numpy.random.sample(catSize)*(80.0))/3600.0
@@ -843,15 +857,12 @@ class GalSimInterfaceTest(unittest.TestCase):
         self.assertGreater(zeroFlux, 0)
 
         for testName in testNames:
-            if os.path.exists(testName):
-                os.unlink(testName)
+            remove_file(testName)
 
         for controlName in controlImages:
-            if os.path.exists(controlName):
-                os.unlink(controlName)
+            remove_file(controlName)
 
-        if os.path.exists(dbName):
-            os.unlink(dbName)
+        remove_file(dbName)
 
 
     def testPSF(self):
@@ -905,10 +916,44 @@ class GalSimInterfaceTest(unittest.TestCase):
         self.assertLess(midP1, 0.5*maxValue, msg=msg)
 
 
+class IntervalOverlapTest(unittest.TestCase):
+
+    def testBoundaries(self):
+        """
+        Test that _intervalsOverlap (used by GalSimInterpreter.findAllDetectors
+        to cull detectors) treats the intervals as closed, i.e. that intervals
+        which only share an endpoint, or which coincide exactly, overlap
+        """
+        self.assertTrue(_intervalsOverlap(0.0, 1.0, 1.0, 2.0))
+        self.assertTrue(_intervalsOverlap(1.0, 2.0, 0.0, 1.0))
+        self.assertTrue(_intervalsOverlap(0.0, 1.0, 0.0, 1.0))
+        self.assertTrue(_intervalsOverlap(0.0, 0.5, 0.0, 1.0))
+        self.assertTrue(_intervalsOverlap(0.5, 1.0, 0.0, 1.0))
+        self.assertTrue(_intervalsOverlap(-1.0, 2.0, 0.0, 1.0))
+        self.assertTrue(_intervalsOverlap(0.0, 0.0, 0.0, 1.0))
+        self.assertFalse(_intervalsOverlap(0.0, 1.0, 1.5, 2.0))
+        self.assertFalse(_intervalsOverlap(1.5, 2.0, 0.0, 1.0))
+
+
+    def testArrays(self):
+        """
+        Test that _intervalsOverlap compares one interval to numpy arrays of
+        intervals, including at the boundaries
+        """
+        bMin = numpy.array([1.0, 0.0, -2.0, 0.25, -1.0, 1.5])
+        bMax = numpy.array([2.0, 1.0, 0.0, 0.75, -0.5, 2.0])
+        control = numpy.array([True, True, True, True, False, False])
+
+        test = _intervalsOverlap(0.0, 1.0, bMin, bMax)
+        self.assertIsInstance(test, numpy.ndarray)
+        numpy.testing.assert_array_equal(test, control)
+
+
 def suite():
     utilsTests.init()
     suites = []
     suites += unittest.makeSuite(GalSimInterfaceTest)
+    suites += unittest.makeSuite(IntervalOverlapTest)
 
     return unittest.TestSuite(suites)
 
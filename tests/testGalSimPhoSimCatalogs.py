@@ -1,10 +1,12 @@
 from __future__ import with_statement
 import os
+import shutil
+import tempfile
 import numpy as np
+from collections import Counter
 import unittest
 import lsst.utils.tests as utilsTests
 
-from lsst.utils import getPackageDir
 from lsst.sims.utils import ObservationMetaData, radiansFromArcsec
 from lsst.sims.catalogs.generation.db import fileDBObject
 from lsst.sims.GalSimInterface import GalSimPhoSimGalaxies, GalSimPhoSimStars, GalSimPhoSimAgn
@@ -14,6 +16,73 @@ from lsst.obs.lsstSim import LsstSimMapper
 
 
 
+# the dtypes of the phoSimMetaData entries
+_float_dtype = np.dtype(np.float64)
+_str_dtype = np.dtype(str)
+
+# functions generating the random values of the catalog columns (other than
+# position, magNorm, and redshift), in the order in which they are drawn
+_random_fields = [('sindex', lambda rr: rr*4.0+1.0),
+                  ('halfLightRadius', lambda rr: radiansFromArcsec(rr*10.0 + 1.0)),
+                  ('positionAngle', lambda rr: rr*np.pi),
+                  ('internalAv', lambda rr: rr*0.5+0.1),
+                  ('internalRv', lambda rr: rr*0.5+2.7),
+                  ('majorAxis', lambda rr: radiansFromArcsec(rr*2.0 + 0.5)),
+                  ('minorAxis', lambda rr: radiansFromArcsec(rr*2.0 + 0.5)),
+                  ('galacticAv', lambda rr: rr*0.5+0.1),
+                  ('galacticRv', lambda rr: rr*0.5+2.7),
+                  ('properMotionRa', lambda rr: radiansFromArcsec(rr*0.0002)),
+                  ('properMotionDec', lambda rr: radiansFromArcsec(rr*0.0002)),
+                  ('radialVelocity', lambda rr: rr*200.0),
+                  ('parallax', lambda rr: radiansFromArcsec(rr*0.0002))]
+
+
+# the format of a row of the catalogs written by _write_catalog; the %s
+# (the SED name, which is the same for every row) is filled in once per catalog
+_catalog_format = '%%d %%f %%f %%f %%f %s' + ' %%f'*15
+
+
+def _write_catalog(file_name, sed_name, ra, dec, magNorm, redshift, zero_fields=()):
+    """
+    Write a text catalog of randomly generated objects, suitable for reading
+    in with a fileDBObject using GalSimPhoSimTest.dtype
+
+    @param [in] file_name is the name of the file to write
+
+    @param [in] sed_name is the name of the SED file assigned to every object
+
+    @param [in] ra and dec are numpy arrays of the positions (in radians) of the objects
+
+    @param [in] magNorm and redshift are numpy arrays of the magNorms and redshifts
+    of the objects
+
+    @param [in] zero_fields is a list of the names of the columns (from _random_fields)
+    which are set to zero rather than randomly generated
+    """
+    n_objects = len(ra)
+
+    values = {}
+    for name, generator in _random_fields:
+        if name in zero_fields:
+            values[name] = np.zeros(n_objects)
+        else:
+            values[name] = generator(np.random.random_sample(n_objects))
+
+    majorAxis = np.maximum(values['majorAxis'], values['minorAxis'])
+    minorAxis = np.minimum(values['majorAxis'], values['minorAxis'])
+
+    np.savetxt(file_name,
+               np.column_stack((np.arange(n_objects), ra, dec, np.degrees(ra), np.degrees(dec),
+                                magNorm, redshift, majorAxis, minorAxis,
+                                values['positionAngle'], values['halfLightRadius'], values['sindex'],
+                                values['internalAv'], values['internalRv'],
+                                values['galacticAv'], values['galacticRv'],
+                                values['properMotionRa'], values['properMotionDec'],
+                                values['radialVelocity'], values['parallax'])),
+               fmt=_catalog_format % sed_name,
+               header='header', comments='# ')
+
+
 class GalSimPhoSimTest(unittest.TestCase):
     """
     Class to test that GalSimPhoSim catalogs produce both GalSim images
@@ -22,17 +91,19 @@ class GalSimPhoSimTest(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        cls.dataDir = os.path.join(getPackageDir('sims_GalSimInterface'),
-                                   'tests', 'scratchSpace')
+        # write all of the catalogs and images to a private temporary directory
+        # (typically on a local or memory-backed file system), which
+        # tearDownClass removes along with everything in it
+        cls.dataDir = tempfile.mkdtemp(prefix='galSimPhoSim_')
         cls.n_objects = 5
         np.random.seed(45)
         pointingRA = 45.2
         pointingDec = -31.6
-        phoSimMetaData = {'pointingRA': (np.radians(pointingRA), np.dtype(np.float)),
-                          'pointingDec': (np.radians(pointingDec), np.dtype(np.float)),
-                          'Opsim_rotskypos': (1.2, np.dtype(np.float)),
-                          'Opsim_filter': ('r', np.dtype(str)),
-                          'Opsim_expmjd': (57341.6, np.dtype(np.float))
+        phoSimMetaData = {'pointingRA': (np.radians(pointingRA), _float_dtype),
+                          'pointingDec': (np.radians(pointingDec), _float_dtype),
+                          'Opsim_rotskypos': (1.2, _float_dtype),
+                          'Opsim_filter': ('r', _str_dtype),
+                          'Opsim_expmjd': (57341.6, _float_dtype)
                           }
         cls.obs = ObservationMetaData(phoSimMetaData=phoSimMetaData,
                                       boundLength=0.1, boundType='circle')
@@ -59,150 +130,62 @@ class GalSimPhoSimTest(unittest.TestCase):
                               ('radialVelocity', np.float),
                               ('parallax', np.float)])
 
-        # generate some galaxy bulge data
-        redshift = np.random.random_sample(cls.n_objects)*1.5
-        rr = np.random.random_sample(cls.n_objects)*0.05
-        theta = np.random.random_sample(cls.n_objects)*2.0*np.pi
+        # draw the positions, magNorms, and redshifts of all four catalogs at once;
+        # row i of each array belongs to the catalog written i-th below
+        redshift = np.random.random_sample((4, cls.n_objects))*1.5
+        rr = np.random.random_sample((4, cls.n_objects))*0.05
+        theta = np.random.random_sample((4, cls.n_objects))*2.0*np.pi
         ra = np.radians(pointingRA + rr*np.cos(theta))
         dec = np.radians(pointingDec + rr*np.sin(theta))
-        magNorm = np.random.random_sample(cls.n_objects)*7.0 + 18.0
-        sindex = np.random.random_sample(cls.n_objects)*4.0+1.0
-        hlr = radiansFromArcsec(np.random.random_sample(cls.n_objects)*10.0 + 1.0)
-        positionAngle = np.random.random_sample(cls.n_objects)*np.pi
-        internalAv = np.random.random_sample(cls.n_objects)*0.5+0.1
-        internalRv = np.random.random_sample(cls.n_objects)*0.5+2.7
-        majorAxis = radiansFromArcsec(np.random.random_sample(cls.n_objects)*2.0 + 0.5)
-        minorAxis = radiansFromArcsec(np.random.random_sample(cls.n_objects)*2.0 + 0.5)
-        galacticAv = np.random.random_sample(cls.n_objects)*0.5+0.1
-        galacticRv = np.random.random_sample(cls.n_objects)*0.5+2.7
-        properMotionRa = np.zeros(cls.n_objects)
-        properMotionDec = np.zeros(cls.n_objects)
-        radialVelocity = np.zeros(cls.n_objects)
-        parallax = np.zeros(cls.n_objects)
-        cls.bulge_name = os.path.join(cls.dataDir, 'galSimPhoSim_test_bulge.dat')
-        with open(cls.bulge_name, 'w') as output_file:
-            output_file.write('# header\n')
-            for ix in range(cls.n_objects):
-                output_file.write('%d %f %f %f %f Const.79E06.002Z.spec %f %f %f %f %f %f %f %f %f %f %f %f %f %f %f\n' %
-                                  (ix, ra[ix], dec[ix], np.degrees(ra[ix]), np.degrees(dec[ix]),
-                                  magNorm[ix], redshift[ix],
-                                  max(majorAxis[ix], minorAxis[ix]), min(majorAxis[ix], minorAxis[ix]),
-                                  positionAngle[ix], hlr[ix], sindex[ix], internalAv[ix], internalRv[ix],
-                                  galacticAv[ix], galacticRv[ix],
-                                  properMotionRa[ix], properMotionDec[ix], radialVelocity[ix], parallax[ix]))
+        magNorm = np.random.random_sample((4, cls.n_objects))*7.0 + 18.0
 
+        shape_fields = ('sindex', 'halfLightRadius', 'positionAngle', 'internalAv', 'internalRv',
+                        'majorAxis', 'minorAxis')
+        motion_fields = ('properMotionRa', 'properMotionDec', 'radialVelocity', 'parallax')
+
+        # generate some galaxy bulge data
+        cls.bulge_name = os.path.join(cls.dataDir, 'galSimPhoSim_test_bulge.dat')
+        _write_catalog(cls.bulge_name, 'Const.79E06.002Z.spec', ra[0], dec[0],
+                       magNorm[0], redshift[0], zero_fields=motion_fields)
 
         # generate some galaxy disk data
-        redshift = np.random.random_sample(cls.n_objects)*1.5
-        rr = np.random.random_sample(cls.n_objects)*0.05
-        theta = np.random.random_sample(cls.n_objects)*2.0*np.pi
-        ra = np.radians(pointingRA + rr*np.cos(theta))
-        dec = np.radians(pointingDec + rr*np.sin(theta))
-        magNorm = np.random.random_sample(cls.n_objects)*7.0 + 18.0
-        sindex = np.random.random_sample(cls.n_objects)*4.0+1.0
-        hlr = radiansFromArcsec(np.random.random_sample(cls.n_objects)*10.0 + 1.0)
-        positionAngle = np.random.random_sample(cls.n_objects)*np.pi
-        internalAv = np.random.random_sample(cls.n_objects)*0.5+0.1
-        internalRv = np.random.random_sample(cls.n_objects)*0.5+2.7
-        majorAxis = radiansFromArcsec(np.random.random_sample(cls.n_objects)*2.0 + 0.5)
-        minorAxis = radiansFromArcsec(np.random.random_sample(cls.n_objects)*2.0 + 0.5)
-        galacticAv = np.random.random_sample(cls.n_objects)*0.5+0.1
-        galacticRv = np.random.random_sample(cls.n_objects)*0.5+2.7
-        properMotionRa = np.zeros(cls.n_objects)
-        properMotionDec = np.zeros(cls.n_objects)
-        radialVelocity = np.zeros(cls.n_objects)
-        parallax = np.zeros(cls.n_objects)
         cls.disk_name = os.path.join(cls.dataDir, 'galSimPhoSim_test_disk.dat')
-        with open(cls.disk_name, 'w') as output_file:
-            output_file.write('# header\n')
-            for ix in range(cls.n_objects):
-                output_file.write('%d %f %f %f %f Inst.79E06.02Z.spec %f %f %f %f %f %f %f %f %f %f %f %f %f %f %f\n' %
-                                  (ix, ra[ix], dec[ix], np.degrees(ra[ix]), np.degrees(dec[ix]),
-                                  magNorm[ix], redshift[ix],
-                                  max(majorAxis[ix], minorAxis[ix]), min(majorAxis[ix], minorAxis[ix]),
-                                  positionAngle[ix], hlr[ix], sindex[ix], internalAv[ix], internalRv[ix],
-                                  galacticAv[ix], galacticRv[ix],
-                                  properMotionRa[ix], properMotionDec[ix], radialVelocity[ix], parallax[ix]))
-
+        _write_catalog(cls.disk_name, 'Inst.79E06.02Z.spec', ra[1], dec[1],
+                       magNorm[1], redshift[1], zero_fields=motion_fields)
 
         # generate some agn data
-        redshift = np.random.random_sample(cls.n_objects)*1.5
-        rr = np.random.random_sample(cls.n_objects)*0.05
-        theta = np.random.random_sample(cls.n_objects)*2.0*np.pi
-        ra = np.radians(pointingRA + rr*np.cos(theta))
-        dec = np.radians(pointingDec + rr*np.sin(theta))
-        magNorm = np.random.random_sample(cls.n_objects)*7.0 + 18.0
-        sindex = np.zeros(cls.n_objects)
-        hlr = np.zeros(cls.n_objects)
-        positionAngle = np.zeros(cls.n_objects)
-        internalAv = np.zeros(cls.n_objects)
-        internalRv = np.zeros(cls.n_objects)
-        majorAxis = np.zeros(cls.n_objects)
-        minorAxis = np.zeros(cls.n_objects)
-        galacticAv = np.random.random_sample(cls.n_objects)*0.5+0.1
-        galacticRv = np.random.random_sample(cls.n_objects)*0.5+2.7
-        properMotionRa = np.zeros(cls.n_objects)
-        properMotionDec = np.zeros(cls.n_objects)
-        radialVelocity = np.zeros(cls.n_objects)
-        parallax = np.zeros(cls.n_objects)
         cls.agn_name = os.path.join(cls.dataDir, 'galSimPhoSim_test_agn.dat')
-        with open(cls.agn_name, 'w') as output_file:
-            output_file.write('# header\n')
-            for ix in range(cls.n_objects):
-                output_file.write('%d %f %f %f %f agn.spec %f %f %f %f %f %f %f %f %f %f %f %f %f %f %f\n' %
-                                  (ix, ra[ix], dec[ix], np.degrees(ra[ix]), np.degrees(dec[ix]),
-                                  magNorm[ix], redshift[ix],
-                                  max(majorAxis[ix], minorAxis[ix]), min(majorAxis[ix], minorAxis[ix]),
-                                  positionAngle[ix], hlr[ix], sindex[ix], internalAv[ix], internalRv[ix],
-                                  galacticAv[ix], galacticRv[ix],
-                                  properMotionRa[ix], properMotionDec[ix], radialVelocity[ix], parallax[ix]))
+        _write_catalog(cls.agn_name, 'agn.spec', ra[2], dec[2],
+                       magNorm[2], redshift[2], zero_fields=shape_fields+motion_fields)
 
         # generate some star data
-        redshift = np.random.random_sample(cls.n_objects)*1.5
-        rr = np.random.random_sample(cls.n_objects)*0.05
-        theta = np.random.random_sample(cls.n_objects)*2.0*np.pi
-        ra = np.radians(pointingRA + rr*np.cos(theta))
-        dec = np.radians(pointingDec + rr*np.sin(theta))
-        magNorm = np.random.random_sample(cls.n_objects)*7.0 + 18.0
-        sindex = np.zeros(cls.n_objects)
-        hlr = np.zeros(cls.n_objects)
-        positionAngle = np.zeros(cls.n_objects)
-        internalAv = np.zeros(cls.n_objects)
-        internalRv = np.zeros(cls.n_objects)
-        majorAxis = np.zeros(cls.n_objects)
-        minorAxis = np.zeros(cls.n_objects)
-        galacticAv = np.random.random_sample(cls.n_objects)*0.5+0.1
-        galacticRv = np.random.random_sample(cls.n_objects)*0.5+2.7
-        properMotionRa = radiansFromArcsec(np.random.random_sample(cls.n_objects)*0.0002)
-        properMotionDec = radiansFromArcsec(np.random.random_sample(cls.n_objects)*0.0002)
-        radialVelocity = np.random.random_sample(cls.n_objects)*200.0
-        parallax = radiansFromArcsec(np.random.random_sample(cls.n_objects)*0.0002)
         cls.star_name = os.path.join(cls.dataDir, 'galSimPhoSim_test_star.dat')
-        with open(cls.star_name, 'w') as output_file:
-            output_file.write('# header\n')
-            for ix in range(cls.n_objects):
-                output_file.write('%d %f %f %f %f km30_5000.fits_g10_5040 %f %f %f %f %f %f %f %f %f %f %f %f %f %f %f\n' %
-                                  (ix, ra[ix], dec[ix], np.degrees(ra[ix]), np.degrees(dec[ix]),
-                                  magNorm[ix], redshift[ix],
-                                  max(majorAxis[ix], minorAxis[ix]), min(majorAxis[ix], minorAxis[ix]),
-                                  positionAngle[ix], hlr[ix], sindex[ix], internalAv[ix], internalRv[ix],
-                                  galacticAv[ix], galacticRv[ix],
-                                  properMotionRa[ix], properMotionDec[ix], radialVelocity[ix], parallax[ix]))
+        _write_catalog(cls.star_name, 'km30_5000.fits_g10_5040', ra[3], dec[3],
+                       magNorm[3], redshift[3], zero_fields=shape_fields)
 
 
     @classmethod
     def tearDownClass(cls):
-        if os.path.exists(cls.bulge_name):
-            os.unlink(cls.bulge_name)
+        shutil.rmtree(cls.dataDir, ignore_errors=True)
 
-        if os.path.exists(cls.disk_name):
-            os.unlink(cls.disk_name)
 
-        if os.path.exists(cls.agn_name):
-            os.unlink(cls.agn_name)
+    def make_db(self, file_name, runtable, objectTypeId):
+        """
+        Create the fileDBObject for one of the text catalogs written by setUpClass.
+        The same fileDBObject is used to drive both the GalSimPhoSim catalog and the
+        PhoSim catalog for that file, so the file is only ingested once.
+
+        @param [in] file_name is the name of the text catalog
+
+        @param [in] runtable is the name of the table the data are ingested into
 
-        if os.path.exists(cls.star_name):
-            os.unlink(cls.star_name)
+        @param [in] objectTypeId is the objectTypeId of the fileDBObject
+        """
+        db = fileDBObject(file_name, dtype=self.dtype, runtable=runtable, idColKey='id')
+        db.raColName = 'ra_deg'
+        db.decColName = 'dec_deg'
+        db.objectTypeId = objectTypeId
+        return db
 
 
     def testGalSimPhoSimCat(self):
@@ -214,10 +197,7 @@ class GalSimPhoSimTest(unittest.TestCase):
         galsim_cat_name = os.path.join(self.dataDir, 'galSimPhoSim_galsim_cat.txt')
         phosim_cat_name = os.path.join(self.dataDir, 'galSimPhoSim_phosim_cat.txt')
         galsim_image_root = os.path.join(self.dataDir, 'galSimPhoSim_images')
-        db = fileDBObject(self.bulge_name, dtype=self.dtype, runtable='test_bulges', idColKey='id')
-        db.raColName = 'ra_deg'
-        db.decColName = 'dec_deg'
-        db.objectTypeId = 55
+        db = self.make_db(self.bulge_name, 'test_bulges', 55)
 
         gs_cat = GalSimPhoSimGalaxies(db, obs_metadata=self.obs)
         gs_cat.bandpassNames = self.obs.bandpass
@@ -229,10 +209,7 @@ class GalSimPhoSimTest(unittest.TestCase):
         ps_cat = PhoSimCatalogSersic2D(db, obs_metadata=self.obs)
         ps_cat.write_catalog(phosim_cat_name)
 
-        db = fileDBObject(self.disk_name, dtype=self.dtype, runtable='test_disks', idColKey='id')
-        db.raColName = 'ra_deg'
-        db.decColName = 'dec_deg'
-        db.objectTypeId = 155
+        db = self.make_db(self.disk_name, 'test_disks', 155)
 
         gs_cat = GalSimPhoSimGalaxies(db, obs_metadata=self.obs)
         gs_cat.bandpassNames = self.obs.bandpass
@@ -244,10 +221,7 @@ class GalSimPhoSimTest(unittest.TestCase):
         ps_cat = PhoSimCatalogSersic2D(db, obs_metadata=self.obs)
         ps_cat.write_catalog(phosim_cat_name, write_header=False, write_mode='a')
 
-        db = fileDBObject(self.agn_name, dtype=self.dtype, runtable='test_agn', idColKey='id')
-        db.raColName = 'ra_deg'
-        db.decColName = 'dec_deg'
-        db.objectTypeId = 255
+        db = self.make_db(self.agn_name, 'test_agn', 255)
 
         gs_cat = GalSimPhoSimAgn(db, obs_metadata=self.obs)
         gs_cat.bandpassNames = self.obs.bandpass
@@ -259,10 +233,7 @@ class GalSimPhoSimTest(unittest.TestCase):
         ps_cat = PhoSimCatalogZPoint(db, obs_metadata=self.obs)
         ps_cat.write_catalog(phosim_cat_name, write_header=False, write_mode='a')
 
-        db = fileDBObject(self.star_name, dtype=self.dtype, runtable='test_agn', idColKey='id')
-        db.raColName = 'ra_deg'
-        db.decColName = 'dec_deg'
-        db.objectTypeId = 255
+        db = self.make_db(self.star_name, 'test_agn', 255)
 
         gs_cat = GalSimPhoSimStars(db, obs_metadata=self.obs)
         gs_cat.bandpassNames = self.obs.bandpass
@@ -274,25 +245,16 @@ class GalSimPhoSimTest(unittest.TestCase):
 
         written_files = gs_cat.write_images(nameRoot=galsim_image_root)
         self.assertGreater(len(written_files), 0)
-        for name in written_files:
-            os.unlink(name)
 
+        # count the lines as they are read, rather than reading whole files into lists
         with open(galsim_cat_name, 'r') as galsim_input:
-            with open(phosim_cat_name, 'r') as phosim_input:
-                galsim_lines = galsim_input.readlines()
-                phosim_lines = phosim_input.readlines()
-                self.assertEqual(len(galsim_lines), len(phosim_lines))
-                self.assertEqual(len(galsim_lines), 4*self.n_objects+5)
-                for line in galsim_lines:
-                    self.assertIn(line, phosim_lines)
-                for line in phosim_lines:
-                    self.assertIn(line, galsim_lines)
-
-        if os.path.exists(galsim_cat_name):
-            os.unlink(galsim_cat_name)
-
-        if os.path.exists(phosim_cat_name):
-            os.unlink(phosim_cat_name)
+            galsim_lines = Counter(galsim_input)
+        with open(phosim_cat_name, 'r') as phosim_input:
+            phosim_lines = Counter(phosim_input)
+
+        self.assertEqual(sum(galsim_lines.values()), sum(phosim_lines.values()))
+        self.assertEqual(sum(galsim_lines.values()), 4*self.n_objects+5)
+        self.assertEqual(galsim_lines, phosim_lines)
 
 
 def suite():
@@ -1,5 +1,7 @@
 import numpy
 import os
+import shutil
+import tempfile
 import unittest
 import lsst.utils.tests as utilsTests
 from lsst.utils import getPackageDir
@@ -12,7 +14,7 @@ from lsst.sims.coordUtils import _raDecFromPixelCoords
 
 from lsst.sims.coordUtils.utils import ReturnCamera
 
-from  testUtils import create_text_catalog
+from testUtils import create_text_catalog, remove_file
 
 class hlrFileDBObj(fileDBObject):
     idColKey = 'test_id'
@@ -49,6 +51,13 @@ class hlrCat(GalSimGalaxies):
 
 class GalSimHlrTest(unittest.TestCase):
 
+    def setUp(self):
+        self.scratchDir = tempfile.mkdtemp(prefix='hlr_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.scratchDir, ignore_errors=True)
+        del self.scratchDir
+
 
     def get_flux_in_half_light_radius(self, fileName, hlr, detector, camera, obs, epoch=2000.0):
         """
@@ -115,7 +124,7 @@ class GalSimHlrTest(unittest.TestCase):
         with the flux contained within the expected half light radius.  Raise an exception
         if the deviation is greater than 3-sigma.
         """
-        scratchDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'scratchSpace')
+        scratchDir = self.scratchDir
         catName = os.path.join(scratchDir, 'hlr_test_Catalog.dat')
         imageRoot = os.path.join(scratchDir, 'hlr_test_Image')
         dbFileName = os.path.join(scratchDir, 'hlr_test_InputCatalog.dat')
@@ -152,12 +161,9 @@ class GalSimHlrTest(unittest.TestCase):
             sigmaFlux = numpy.sqrt(0.5*totalFlux/cat.photParams.gain) #divide by gain because Poisson stats apply to photons
             self.assertLess(numpy.abs(hlrFlux-0.5*totalFlux), 4.0*sigmaFlux)
 
-            if os.path.exists(catName):
-                os.unlink(catName)
-            if os.path.exists(dbFileName):
-                os.unlink(dbFileName)
-            if os.path.exists(imageName):
-                os.unlink(imageName)
+            remove_file(catName)
+            remove_file(dbFileName)
+            remove_file(imageName)
 
 
 
@@ -1,5 +1,7 @@
 import numpy
 import os
+import shutil
+import tempfile
 import unittest
 import lsst.utils.tests as utilsTests
 from lsst.utils import getPackageDir
@@ -13,7 +15,7 @@ from lsst.sims.coordUtils import _raDecFromPixelCoords
 
 from lsst.sims.coordUtils.utils import ReturnCamera
 
-from  testUtils import create_text_catalog
+from testUtils import create_text_catalog, remove_file
 
 class outputWcsFileDBObj(fileDBObject):
     idColKey = 'test_id'
@@ -45,6 +47,14 @@ class outputWcsCat(GalSimStars):
 
 class GalSimOutputWcsTest(unittest.TestCase):
 
+    def setUp(self):
+        self.scratchDir = tempfile.mkdtemp(prefix='outputWcs_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.scratchDir, ignore_errors=True)
+        del self.scratchDir
+
+
     def testOutputWcsOfImage(self):
         """
         Test that, when GalSim generates an image, in encodes the WCS in a
@@ -54,7 +64,7 @@ class GalSimOutputWcsTest(unittest.TestCase):
         Raise an exception if the median difference between the two is
         greater than 0.01 arcseconds.
         """
-        scratchDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'scratchSpace')
+        scratchDir = self.scratchDir
         catName = os.path.join(scratchDir, 'outputWcs_test_Catalog.dat')
         imageRoot = os.path.join(scratchDir, 'outputWcs_test_Image')
         dbFileName = os.path.join(scratchDir, 'outputWcs_test_InputCatalog.dat')
@@ -138,12 +148,9 @@ class GalSimOutputWcsTest(unittest.TestCase):
             msg = 'medianError was %e' % medianError
             self.assertLess(medianError, 0.01, msg=msg)
 
-            if os.path.exists(catName):
-                os.unlink(catName)
-            if os.path.exists(dbFileName):
-                os.unlink(dbFileName)
-            if os.path.exists(imageName):
-                os.unlink(imageName)
+            remove_file(catName)
+            remove_file(dbFileName)
+            remove_file(imageName)
 
 
 
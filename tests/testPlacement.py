@@ -3,6 +3,8 @@ import lsst.utils.tests as utilsTests
 
 import numpy
 import os
+import shutil
+import tempfile
 from lsst.utils import getPackageDir
 import lsst.afw.image as afwImage
 from lsst.sims.utils import ObservationMetaData, radiansFromArcsec, arcsecFromRadians, haversine
@@ -11,7 +13,7 @@ from lsst.sims.coordUtils import _pixelCoordsFromRaDec, _raDecFromPixelCoords
 from lsst.sims.photUtils import Sed, Bandpass
 from lsst.sims.catalogs.generation.db import fileDBObject
 from lsst.sims.GalSimInterface import GalSimStars, SNRdocumentPSF
-from testUtils import create_text_catalog
+from testUtils import create_text_catalog, remove_file
 
 class placementFileDBObj(fileDBObject):
     idColKey = 'test_id'
@@ -48,6 +50,11 @@ class GalSimPlacementTest(unittest.TestCase):
 
     def setUp(self):
         self.magNorm=19.0
+        self.scratchDir = tempfile.mkdtemp(prefix='placement_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.scratchDir, ignore_errors=True)
+        del self.scratchDir
 
     def check_placement(self, imageName, raList, decList, fwhmList,
                         countList, gain,
@@ -140,7 +147,7 @@ class GalSimPlacementTest(unittest.TestCase):
         circles of 2 fwhm radii about the object's expected positions with
         the actual expected flux of the objects.
         """
-        scratchDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'scratchSpace')
+        scratchDir = self.scratchDir
         catName = os.path.join(scratchDir, 'placementCatalog.dat')
         imageRoot = os.path.join(scratchDir, 'placementImage')
         dbFileName = os.path.join(scratchDir, 'placementInputCatalog.dat')
@@ -226,12 +233,9 @@ class GalSimPlacementTest(unittest.TestCase):
                                 numpy.array([actualCounts]*len(objRaList)),
                                 cat.photParams.gain, detector, camera, obs, epoch=2000.0)
 
-            if os.path.exists(dbFileName):
-                os.unlink(dbFileName)
-            if os.path.exists(catName):
-                os.unlink(catName)
-            if os.path.exists(imageName):
-                os.unlink(imageName)
+            remove_file(dbFileName)
+            remove_file(catName)
+            remove_file(imageName)
 
 
 def suite():
@@ -1,5 +1,7 @@
 import numpy
 import os
+import shutil
+import tempfile
 import unittest
 import lsst.utils.tests as utilsTests
 from lsst.utils import getPackageDir
@@ -11,7 +13,7 @@ from lsst.sims.coordUtils import _raDecFromPixelCoords
 
 from lsst.sims.coordUtils.utils import ReturnCamera
 
-from  testUtils import create_text_catalog
+from testUtils import create_text_catalog, remove_file
 
 class paFileDBObj(fileDBObject):
     idColKey = 'test_id'
@@ -48,6 +50,13 @@ class paCat(GalSimGalaxies):
 
 class GalSimPositionAngleTest(unittest.TestCase):
 
+    def setUp(self):
+        self.scratchDir = tempfile.mkdtemp(prefix='pa_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.scratchDir, ignore_errors=True)
+        del self.scratchDir
+
 
     def get_position_angle(self, imageName, afwCamera, afwDetector, \
                            obs_metadata, epoch):
@@ -156,7 +165,7 @@ class GalSimPositionAngleTest(unittest.TestCase):
         axis of the image.  Throw an exception if that angle differs
         from the expected position angle by more than 2 degrees.
         """
-        scratchDir = os.path.join(getPackageDir('sims_GalSimInterface'), 'tests', 'scratchSpace')
+        scratchDir = self.scratchDir
         catName = os.path.join(scratchDir, 'pa_test_Catalog.dat')
         imageRoot = os.path.join(scratchDir, 'pa_test_Image')
         dbFileName = os.path.join(scratchDir, 'pa_test_InputCatalog.dat')
@@ -210,12 +219,9 @@ class GalSimPositionAngleTest(unittest.TestCase):
                                                   ])).min()
                 self.assertLess(deviation, 2.0)
 
-                if os.path.exists(catName):
-                    os.unlink(catName)
-                if os.path.exists(dbFileName):
-                    os.unlink(dbFileName)
-                if os.path.exists(imageName):
-                    os.unlink(imageName)
+                remove_file(catName)
+                remove_file(dbFileName)
+                remove_file(imageName)
 
 
 
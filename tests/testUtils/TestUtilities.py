@@ -1,11 +1,28 @@
 import os
+import errno
 import numpy
 from lsst.afw.cameraGeom import PIXELS, FOCAL_PLANE
 from lsst.sims.utils import radiansFromArcsec, icrsFromObserved
 
-__all__ = ["create_text_catalog"]
+__all__ = ["create_text_catalog", "remove_file"]
 
 
+def remove_file(file_name):
+    """
+    Delete a file if it exists.
+
+    This just tries the unlink and ignores the error raised for a missing
+    file, rather than checking os.path.exists() first (which would cost
+    a second stat of the file).
+
+    @param [in] file_name is the name of the file to be deleted
+    """
+    try:
+        os.unlink(file_name)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
 def create_text_catalog(obs, file_name, raDisplacement, decDisplacement, \
                         hlr=None, mag_norm=None, pa=None):
     """
@@ -30,8 +47,7 @@ def create_text_catalog(obs, file_name, raDisplacement, decDisplacement, \
     @param [in] pa is an optional list of the objects' position angles in degrees
     """
 
-    if os.path.exists(file_name):
-        os.unlink(file_name)
+    remove_file(file_name)
 
     raDisplacementList = radiansFromArcsec(raDisplacement)
     decDisplacementList = radiansFromArcsec(decDisplacement)